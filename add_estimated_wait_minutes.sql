@@ -0,0 +1,9 @@
+-- Precompute the pseudo wait-time estimate as a stored generated column so
+-- the API just reads it instead of hashing the id per row per request.
+-- hashtext is deterministic within a cluster, so the value is stable across
+-- API processes and restarts (unlike Python's randomized hash()).
+-- Run this in your Supabase SQL editor (like add_helper_functions.sql).
+
+ALTER TABLE restaurants
+    ADD COLUMN IF NOT EXISTS estimated_wait_minutes int
+    GENERATED ALWAYS AS (15 + (abs(hashtext(id::text)) % 20)) STORED;
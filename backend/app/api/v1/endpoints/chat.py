@@ -4,16 +4,13 @@ Chat and conversational AI endpoints
 
 from typing import Optional, List
 from fastapi import APIRouter, HTTPException, Depends
-from app.services.ai_service import AIService
+from fastapi.responses import StreamingResponse
+from app.services.ai_service import AIService, get_ai_service
 from app.services.restaurant_service import RestaurantService
 from app.schemas.user import ChatMessageRequest, ChatMessageResponse
 
 router = APIRouter()
 
-def get_ai_service() -> AIService:
-    """Dependency to get AI service"""
-    return AIService()
-
 def get_restaurant_service() -> RestaurantService:
     """Dependency to get restaurant service"""
     return RestaurantService()
@@ -91,6 +88,30 @@ async def process_chat_message(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Chat processing failed: {str(e)}")
 
+@router.post("/message/stream")
+async def stream_chat_message(
+    request: ChatMessageRequest,
+    ai_service: AIService = Depends(get_ai_service)
+):
+    """
+    Stream the conversational response as plain text chunks
+
+    Tokens are forwarded as they arrive from the model, cutting perceived
+    latency to roughly the time-to-first-token
+    """
+    try:
+        extracted_prefs = await ai_service.extract_preferences(
+            request.message,
+            request.context
+        )
+
+        return StreamingResponse(
+            ai_service.generate_response_stream(request.message, extracted_prefs),
+            media_type="text/plain"
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Chat streaming failed: {str(e)}")
+
 @router.get("/{user_id}/history")
 async def get_chat_history(
     user_id: str,
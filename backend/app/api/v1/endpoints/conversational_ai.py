@@ -7,7 +7,7 @@ from pydantic import BaseModel
 
 from ....models.menu_item import MenuItemSearchRequest, MenuItem
 from ....services.menu_item_service import menu_item_service
-from ....services.ai_service import ai_service
+from ....services.ai_service import get_ai_service
 
 router = APIRouter()
 
@@ -59,7 +59,7 @@ async def conversational_food_search(request: ConversationalSearchRequest):
     """
     try:
         # Extract preferences and intent from the message
-        preferences_result = await ai_service.extract_preferences(
+        preferences_result = await get_ai_service().extract_preferences(
             request.message, 
             request.context
         )
@@ -134,7 +134,7 @@ async def refine_menu_search(request: Dict[str, Any]):
     
     try:
         # Process refinement request
-        refinement = await ai_service.process_search_refinement(
+        refinement = await get_ai_service().process_search_refinement(
             refinement_message,
             current_filters,
             current_results
@@ -179,7 +179,7 @@ async def explain_menu_item_recommendation(request: Dict[str, Any]):
             raise HTTPException(status_code=404, detail="Menu item not found")
         
         # Generate explanation using AI
-        explanation = await ai_service.explain_recommendation(
+        explanation = await get_ai_service().explain_recommendation(
             menu_item.dict(),
             user_preferences,
             search_context
@@ -217,7 +217,7 @@ async def compare_menu_items(request: Dict[str, Any]):
             raise HTTPException(status_code=400, detail="Need at least 2 items to compare")
         
         # Generate AI comparison
-        comparison = await ai_service.compare_menu_items(
+        comparison = await get_ai_service().compare_menu_items(
             [item.dict() for item in menu_items],
             comparison_criteria
         )
@@ -6,7 +6,7 @@ from fastapi import APIRouter, HTTPException, Depends
 from typing import Dict, Any, List, Optional
 from pydantic import BaseModel
 import logging
-from app.services.enhanced_ai_service import EnhancedAIService
+from app.services.enhanced_ai_service import get_enhanced_ai_service
 
 logger = logging.getLogger(__name__)
 
@@ -28,8 +28,6 @@ class EnhancedConversationalSearchResponse(BaseModel):
     tools_used: List[str]
     conversation_id: Optional[str] = None
 
-# Initialize enhanced AI service
-enhanced_ai_service = EnhancedAIService()
 
 @router.post("/enhanced-search", response_model=EnhancedConversationalSearchResponse)
 async def enhanced_conversational_search(request: EnhancedConversationalSearchRequest):
@@ -40,7 +38,7 @@ async def enhanced_conversational_search(request: EnhancedConversationalSearchRe
         logger.info(f"🔍 Enhanced conversational search request: {request.message[:100]}...")
         
         # Use enhanced AI service with tool calling
-        result = await enhanced_ai_service.enhanced_conversational_search(
+        result = await get_enhanced_ai_service().enhanced_conversational_search(
             message=request.message,
             user_id=request.user_id,
             context=request.context,
@@ -71,7 +69,7 @@ async def menu_research_tool(
     Tool for researching menu items and trends
     """
     try:
-        result = await enhanced_ai_service.call_menu_research_tool(query, location)
+        result = await get_enhanced_ai_service().call_menu_research_tool(query, location)
         return {
             "tool": "menu_research",
             "query": query,
@@ -94,7 +92,7 @@ async def nutrition_analysis_tool(
     Tool for analyzing nutrition content of menu items
     """
     try:
-        result = await enhanced_ai_service.call_nutrition_analysis_tool(menu_item)
+        result = await get_enhanced_ai_service().call_nutrition_analysis_tool(menu_item)
         return {
             "tool": "nutrition_analysis",
             "menu_item": menu_item,
@@ -116,7 +114,7 @@ async def restaurant_insights_tool(
     Tool for getting restaurant insights and information
     """
     try:
-        result = await enhanced_ai_service.call_restaurant_insights_tool(restaurant_name)
+        result = await get_enhanced_ai_service().call_restaurant_insights_tool(restaurant_name)
         return {
             "tool": "restaurant_insights",
             "restaurant": restaurant_name,
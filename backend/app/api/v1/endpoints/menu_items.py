@@ -3,7 +3,7 @@ Menu Items API endpoints for the new frontend_new integration
 """
 from typing import List
 from fastapi import APIRouter, HTTPException, Query
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 
 from ....models.menu_item import (
     MenuItem,
@@ -25,7 +25,10 @@ async def search_menu_items(request: MenuItemSearchRequest):
     """
     try:
         result = await menu_item_service.search_menu_items(request)
-        return result
+        # The service already returns a validated MenuItemSearchResponse;
+        # returning a Response directly skips FastAPI's second validation
+        # pass and lets orjson serialize the dump in one go
+        return ORJSONResponse(result.model_dump(mode='json'))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
 
@@ -129,7 +129,7 @@ async def get_user_profile(user_id: str, current_user_id: str = Depends(get_user
             weight=str(profile_data.get('weight_kg', '')),
             gender=profile_data.get('gender') or '',
             activityLevel=profile_data.get('activity_level') or '',
-            goals=profile_data.get('goals') or [],
+            goals=tuple(profile_data.get('goals') or ()),
             appleId=profile_data.get('apple_id') or '',
             healthData=profile_data.get('profile_extensions') or {}
         )
@@ -31,11 +31,19 @@ class Settings(BaseSettings):
     
     # AI/ML APIs
     GROQ_API_KEY: Optional[str] = None
+    GROQ_MAX_CONCURRENCY: int = 8
     HUGGINGFACE_API_TOKEN: Optional[str] = None
     GOOGLE_PLACES_API_KEY: Optional[str] = None
     
     # Development settings
     MOCK_DATA: bool = False
+
+    # Race the fast and fallback models on preference extraction and keep
+    # the first valid response; disable to always use the single fast model
+    SPECULATIVE_EXTRACTION: bool = True
+
+    # Wall-clock budget for one enhanced-search pipeline run, in seconds
+    PIPELINE_BUDGET_SEC: float = 10.0
     
     # CORS
     BACKEND_CORS_ORIGINS: List[str] = [
@@ -2,31 +2,63 @@
 Supabase client configuration and utilities
 """
 
+from functools import lru_cache
+from typing import Optional
+
+import httpx
+
 from supabase import create_client, Client
 from app.core.config import settings
 import logging
 
 logger = logging.getLogger(__name__)
 
-# Global Supabase client instance
-_supabase_client: Client = None
+# Shared async HTTP client for direct PostgREST calls on hot read paths,
+# bypassing the synchronous supabase client and its stdlib json parsing.
+# One pool per process, same pattern as the shared Groq client.
+_postgrest_client: Optional[httpx.AsyncClient] = None
+
+def get_postgrest_client() -> httpx.AsyncClient:
+    """Get or create the shared async PostgREST client"""
+    global _postgrest_client
+    if _postgrest_client is None:
+        _postgrest_client = httpx.AsyncClient(
+            base_url=f"{settings.SUPABASE_URL}/rest/v1",
+            headers={
+                'apikey': settings.SUPABASE_SERVICE_ROLE_KEY,
+                'Authorization': f"Bearer {settings.SUPABASE_SERVICE_ROLE_KEY}",
+                'Content-Type': 'application/json',
+            },
+            http2=True,
+            timeout=httpx.Timeout(30.0, connect=2.0),
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=32, keepalive_expiry=60),
+        )
+    return _postgrest_client
+
+async def close_postgrest_client() -> None:
+    """Close the shared client's connection pool; call on app shutdown"""
+    global _postgrest_client
+    if _postgrest_client is not None:
+        await _postgrest_client.aclose()
+        _postgrest_client = None
 
+@lru_cache(maxsize=1)
 def get_supabase_client() -> Client:
-    """Get or create Supabase client"""
-    global _supabase_client
-    
-    if _supabase_client is None:
-        try:
-            _supabase_client = create_client(
-                settings.SUPABASE_URL,
-                settings.SUPABASE_SERVICE_ROLE_KEY
-            )
-            logger.info("Supabase client initialized successfully")
-        except Exception as e:
-            logger.error(f"Failed to initialize Supabase client: {e}")
-            raise
-    
-    return _supabase_client
+    """Get or create the per-process Supabase client
+
+    lru_cache turns repeat calls into a single C-level dict hit; a failed
+    initialization is not cached, so the next call retries.
+    """
+    try:
+        client = create_client(
+            settings.SUPABASE_URL,
+            settings.SUPABASE_SERVICE_ROLE_KEY
+        )
+        logger.info("Supabase client initialized successfully")
+        return client
+    except Exception as e:
+        logger.error(f"Failed to initialize Supabase client: {e}")
+        raise
 
 def get_supabase_anon_client() -> Client:
     """Get Supabase client with anon key (for public operations)"""
@@ -2,7 +2,7 @@
 MenuItem data models for the new menu-item focused frontend
 """
 from typing import List, Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 from datetime import datetime
 
 
@@ -68,6 +68,33 @@ class MenuItem(BaseModel):
     popularity_score: Optional[float] = None
     last_updated: Optional[datetime] = None
 
+    # Normalized tag caches used by the search filters; filled eagerly at
+    # construction so concurrent readers never race a lazy first compute.
+    # Mutating dietary/allergens/category afterwards does not refresh them.
+    _dietary_lower: frozenset = PrivateAttr(default=frozenset())
+    _allergens_lower: frozenset = PrivateAttr(default=frozenset())
+    _category_lower: str = PrivateAttr(default="")
+
+    def model_post_init(self, __context) -> None:
+        self._dietary_lower = frozenset(map(str.lower, self.dietary))
+        self._allergens_lower = frozenset(map(str.lower, self.allergens))
+        self._category_lower = self.category.lower()
+
+    @property
+    def dietary_lower(self) -> frozenset:
+        """Lowercased dietary tags as a frozenset"""
+        return self._dietary_lower
+
+    @property
+    def allergens_lower(self) -> frozenset:
+        """Lowercased allergen tags as a frozenset"""
+        return self._allergens_lower
+
+    @property
+    def category_lower(self) -> str:
+        """Lowercased category string"""
+        return self._category_lower
+
 
 class MenuItemSearchRequest(BaseModel):
     """Request model for menu item search"""
@@ -97,6 +124,10 @@ class MenuItemSearchRequest(BaseModel):
     sort_order: Optional[str] = "desc"  # "asc", "desc"
     limit: Optional[int] = 20
     offset: Optional[int] = 0
+    # Opaque keyset cursor from a previous page's meta; when set (and the
+    # sort field supports it) pagination seeks past the cursor instead of
+    # scanning and discarding offset rows
+    cursor: Optional[str] = None
 
 
 class MenuItemSearchResponse(BaseModel):
@@ -2,18 +2,34 @@
 User and Profile data models
 """
 
+from functools import lru_cache
 from typing import List, Optional, Dict, Any
-from pydantic import BaseModel, UUID4, EmailStr
+from pydantic import BaseModel, UUID4, field_validator
 from datetime import datetime
 
+@lru_cache(maxsize=8192)
+def _validate_email(email: str) -> str:
+    """Validate and normalize an email address, cached per unique address.
+
+    Repeat users (login/refresh flows) cost a dict lookup instead of a full
+    email-validator pass.
+    """
+    from email_validator import validate_email
+    return validate_email(email, check_deliverability=False).normalized
+
 class User(BaseModel):
     """Database user model"""
     id: UUID4
-    email: Optional[EmailStr] = None
+    email: Optional[str] = None
     apple_id: Optional[str] = None
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
 
+    @field_validator('email')
+    @classmethod
+    def _check_email(cls, v: Optional[str]) -> Optional[str]:
+        return _validate_email(v) if v else v
+
 class UserProfile(BaseModel):
     """Database user profile model"""
     user_id: UUID4
@@ -22,11 +38,11 @@ class UserProfile(BaseModel):
     weight_kg: Optional[float] = None
     gender: Optional[str] = None
     activity_level: Optional[str] = None
-    goals: Optional[List[str]] = None
+    goals: Optional[tuple[str, ...]] = None
     budget_usd_per_meal: Optional[float] = None
     max_walk_time_minutes: Optional[int] = None
-    dietary_restrictions: Optional[List[str]] = None
-    allergies: Optional[List[str]] = None
+    dietary_restrictions: Optional[tuple[str, ...]] = None
+    allergies: Optional[tuple[str, ...]] = None
     profile_extensions: Optional[Dict[str, Any]] = None
     schema_version: Optional[int] = 1
     created_at: Optional[datetime] = None
@@ -39,7 +55,7 @@ class FrontendUserProfile(BaseModel):
     weight: str  # e.g., "159"
     gender: str
     activityLevel: str
-    goals: List[str]
+    goals: tuple[str, ...]
     appleId: Optional[str] = None
     healthData: Optional[Dict[str, Any]] = None
 
@@ -66,7 +82,7 @@ class HealthConnection(BaseModel):
     """Health data connection"""
     user_id: UUID4
     source: str  # 'apple_health', 'google_fit'
-    scopes: List[str]
+    scopes: tuple[str, ...]
     sync_token: Optional[str] = None
     last_sync_at: Optional[datetime] = None
     status: str = 'active'  # 'active', 'paused', 'revoked'
@@ -3,14 +3,19 @@ User API schemas for requests and responses
 """
 
 from typing import List, Optional, Dict, Any
-from pydantic import BaseModel, EmailStr
-from app.models.user import FrontendUserProfile, ExtractedPreferences, LearnedInsights, PersonalizationData
+from pydantic import BaseModel, field_validator
+from app.models.user import FrontendUserProfile, ExtractedPreferences, LearnedInsights, PersonalizationData, _validate_email
 
 class UserCreateRequest(BaseModel):
     """Request to create new user"""
-    email: Optional[EmailStr] = None
+    email: Optional[str] = None
     apple_id: Optional[str] = None
 
+    @field_validator('email')
+    @classmethod
+    def _check_email(cls, v: Optional[str]) -> Optional[str]:
+        return _validate_email(v) if v else v
+
 class UserProfileUpdateRequest(BaseModel):
     """Request to update user profile"""
     age: Optional[int] = None
@@ -12,6 +12,21 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Keyword sets used by the mock translator, built once at import time so each
+# chat message doesn't re-allocate the same dict/list literals
+_PROTEIN_KW = frozenset({"protein", "workout", "gym", "fitness", "muscle", "recovery"})
+_BUDGET_KW = frozenset({"budget", "cheap", "affordable", "under"})
+_SPEED_KW = frozenset({"quick", "fast", "hurry", "asap", "rush"})
+_HEALTH_KW = frozenset({"healthy", "clean", "nutrition", "low-calorie"})
+_POPULAR_KW = frozenset({"popular", "trending", "best", "recommended"})
+_CUISINE_KW: Dict[str, frozenset] = {
+    "italian": frozenset({"italian", "pasta", "risotto"}),
+    "asian": frozenset({"asian", "chinese", "japanese", "thai", "ramen"}),
+    "mexican": frozenset({"mexican", "taco", "burrito", "quesadilla"}),
+    "mediterranean": frozenset({"mediterranean", "greek", "hummus", "falafel"}),
+    "american": frozenset({"american", "sandwich", "grilled"}),
+}
+
 class AIQueryTranslator:
     """AI service that translates user natural language into recommendation engine parameters"""
     
@@ -78,7 +93,7 @@ class AIQueryTranslator:
         query_parts = []
         
         # Protein/fitness related
-        if any(word in message_lower for word in ['protein', 'workout', 'gym', 'fitness', 'muscle', 'recovery']):
+        if any(word in message_lower for word in _PROTEIN_KW):
             query_parts.append("high protein")
             translation["filters"]["min_protein"] = 25
             translation["ai_response"] = "Perfect! I'm searching for high-protein options that align with your fitness goals."
@@ -101,7 +116,7 @@ class AIQueryTranslator:
                 translation["ai_response"] = f"Great! I'm finding delicious {', '.join(dietary_restrictions)} options for you."
         
         # Budget/price related
-        if any(word in message_lower for word in ['budget', 'cheap', 'affordable', 'under']):
+        if any(word in message_lower for word in _BUDGET_KW):
             if '$' in user_message:
                 import re
                 price_match = re.search(r'\$(\d+)', user_message)
@@ -117,14 +132,14 @@ class AIQueryTranslator:
                 translation["ai_response"] = "I'm finding great value options that don't compromise on quality or taste."
         
         # Speed/urgency
-        if any(word in message_lower for word in ['quick', 'fast', 'hurry', 'asap', 'rush']):
+        if any(word in message_lower for word in _SPEED_KW):
             query_parts.append("quick")
             translation["personalization"]["urgency"] = "high"
             if not translation["ai_response"]:
                 translation["ai_response"] = "I understand you're in a rush! Finding quick-prep options for you."
         
         # Health/nutrition
-        if any(word in message_lower for word in ['healthy', 'clean', 'nutrition', 'low-calorie']):
+        if any(word in message_lower for word in _HEALTH_KW):
             query_parts.append("healthy")
             translation["filters"]["max_calories"] = 600
             if not translation["ai_response"]:
@@ -145,15 +160,7 @@ class AIQueryTranslator:
             translation["ai_response"] = "I'm finding healthy salad options for you."
         else:
             # Cuisine types (fallback)
-            cuisine_keywords = {
-                'italian': ['italian', 'pasta', 'risotto'],
-                'asian': ['asian', 'chinese', 'japanese', 'thai', 'ramen'],
-                'mexican': ['mexican', 'taco', 'burrito', 'quesadilla'],
-                'mediterranean': ['mediterranean', 'greek', 'hummus', 'falafel'],
-                'american': ['american', 'sandwich', 'grilled']
-            }
-            
-            for cuisine, keywords in cuisine_keywords.items():
+            for cuisine, keywords in _CUISINE_KW.items():
                 if any(keyword in message_lower for keyword in keywords):
                     query_parts.append(cuisine)
                     translation["personalization"]["cuisine_preference"] = cuisine
@@ -162,7 +169,7 @@ class AIQueryTranslator:
                 break
         
         # Popular/trending
-        if any(word in message_lower for word in ['popular', 'trending', 'best', 'recommended']):
+        if any(word in message_lower for word in _POPULAR_KW):
             query_parts.append("popular")
             translation["personalization"]["sort_by"] = "popularity"
             if not translation["ai_response"]:
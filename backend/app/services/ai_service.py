@@ -2,47 +2,480 @@
 AI service for DeepSeek-V3 integration and text analysis
 """
 
-import json
+import functools
+import os
+import re
+import time
 import asyncio
-from typing import Dict, Any, List, Optional
+import hashlib
+import pickle
+from collections import OrderedDict
+from pathlib import Path
+from typing import AsyncIterator, Dict, Any, List, Optional
+import numpy as np
+import httpx
+import orjson
 from groq import AsyncGroq
+from pydantic import TypeAdapter
 from app.core.config import settings
 from app.models.user import ExtractedPreferences
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Built once at import so every extraction reuses the same compiled
+# pydantic-core validator; validate_json parses and validates in one pass
+_PREFS_ADAPTER = TypeAdapter(ExtractedPreferences)
+
+# Schema-constrained decoding: the server can only emit JSON matching the
+# schema, so malformed-output fallbacks stop costing a wasted round trip.
+# strict mode is off deliberately — every ExtractedPreferences field is
+# optional and the compact analysis schema lets the model omit
+# low-confidence tags, both of which strict decoding rejects
+_PREFS_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "extracted_preferences",
+        "schema": ExtractedPreferences.model_json_schema(),
+    },
+}
+
+_ANALYZE_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "menu_item_analysis",
+        "schema": {
+            "type": "object",
+            "properties": {
+                "tags": {
+                    "type": "object",
+                    "properties": {
+                        key: {"type": "number"} for key in ("hp", "vg", "gf", "kt", "ai")
+                    },
+                    "additionalProperties": False,
+                },
+                "np": {
+                    "type": "object",
+                    "properties": {
+                        "p": {"type": "string", "enum": ["l", "m", "h"]},
+                        "c": {"type": "string", "enum": ["s", "c", "l"]},
+                        "f": {"type": "string", "enum": ["s", "h", "m"]},
+                    },
+                    "additionalProperties": False,
+                },
+                "cm": {"type": "array", "items": {"type": "string"}},
+                "al": {
+                    "type": "object",
+                    "properties": {
+                        "c": {"type": "array", "items": {"type": "string"}},
+                        "f": {"type": "array", "items": {"type": "string"}},
+                    },
+                    "additionalProperties": False,
+                },
+                "mc": {"type": "array", "items": {"type": "string"}},
+                "iq": {"type": "array", "items": {"type": "string"}},
+                "ci": {"type": "array", "items": {"type": "string"}},
+            },
+            "additionalProperties": False,
+        },
+    },
+}
+
+# Shared sentence-transformer for semantic caching, loaded lazily so mock
+# mode never pays the model load
+_EMBEDDING_MODEL = None
+
+def _get_embedding_model():
+    """Get or load the shared MiniLM embedding model"""
+    global _EMBEDDING_MODEL
+    if _EMBEDDING_MODEL is None:
+        from sentence_transformers import SentenceTransformer
+        _EMBEDDING_MODEL = SentenceTransformer('sentence-transformers/all-MiniLM-L6-v2')
+    return _EMBEDDING_MODEL
+
+def _embed(text: str) -> np.ndarray:
+    """Embed text as an L2-normalized float32 vector"""
+    model = _get_embedding_model()
+    return model.encode([text], normalize_embeddings=True)[0].astype(np.float32)
+
+# One Groq client per process: every AIService instance shares the same
+# HTTP/2 connection pool, so new instances (per-request dependencies,
+# workers) skip the TLS handshake and multiplex concurrent calls
+_GROQ_CLIENT: Optional[AsyncGroq] = None
+
+def _get_groq_client() -> AsyncGroq:
+    """Get or create the shared AsyncGroq client"""
+    global _GROQ_CLIENT
+    if _GROQ_CLIENT is None:
+        _GROQ_CLIENT = AsyncGroq(
+            api_key=settings.GROQ_API_KEY,
+            http_client=httpx.AsyncClient(
+                http2=True,
+                timeout=httpx.Timeout(30.0, connect=2.0),
+                limits=httpx.Limits(max_connections=128, max_keepalive_connections=64, keepalive_expiry=60),
+            ),
+        )
+    return _GROQ_CLIENT
+
+async def close_groq_client() -> None:
+    """Close the shared client's connection pool; call on app shutdown"""
+    global _GROQ_CLIENT
+    if _GROQ_CLIENT is not None:
+        await _GROQ_CLIENT.close()
+        _GROQ_CLIENT = None
+
+# Precompiled keyword sets and budget pattern for the mock extractor, so a
+# call does set intersections instead of rebuilding list literals
+_BUDGET_RE = re.compile(r'\$(\d+)')
+_HEALTHY_KW = frozenset({'healthy', 'nutrition', 'clean'})
+_COMFORT_KW = frozenset({'comfort', 'indulge'})
+_QUICK_KW = frozenset({'quick', 'fast', 'asap'})
+_SLOW_KW = frozenset({'slow', 'leisurely'})
+
+_U64 = np.uint64
+
+def _popcount64(x: np.ndarray) -> np.ndarray:
+    """Vectorized 64-bit popcount (SWAR).
+
+    numpy grows bitwise_count in 2.0; the repo pins 1.24, so count set
+    bits with the classic shift-and-mask reduction instead.
+    """
+    x = x - ((x >> _U64(1)) & _U64(0x5555555555555555))
+    x = (x & _U64(0x3333333333333333)) + ((x >> _U64(2)) & _U64(0x3333333333333333))
+    x = (x + (x >> _U64(4))) & _U64(0x0F0F0F0F0F0F0F0F)
+    return ((x * _U64(0x0101010101010101)) >> _U64(56)).astype(np.int64)
+
+# Single-pass scanner for the mock menu analyzer: one traversal of the item
+# text collects every keyword hit instead of a substring scan per keyword
+_ANALYZE_SCAN = re.compile(r'protein|beef|chicken|vegan|quinoa|rice|grilled')
+_HIGH_PROTEIN_KW = frozenset({'protein', 'beef'})
+_PROTEIN_LEVEL_KW = frozenset({'beef', 'chicken', 'protein'})
+_GLUTEN_FREE_KW = frozenset({'quinoa', 'rice'})
+
+# Static instruction blocks are sent as the system message so the byte-
+# identical prefix can be reused by provider-side prompt caching; only the
+# short user message varies per call
+_EXTRACT_PREFS_SYSTEM = """Analyze the user's food preference message with deep reasoning.
+
+Extract comprehensive preferences and return valid JSON:
+{
+    "budget": number or null,
+    "health_priority": "low" | "medium" | "high",
+    "portion_preference": "small" | "medium" | "large" | "filling",
+    "dietary_restrictions": [{"restriction": "string", "confidence": 0.0-1.0}],
+    "cuisine_preferences": ["string"],
+    "urgency": "low" | "normal" | "high",
+    "emotional_context": "comfort" | "energy" | "social" | "celebration" | "stress",
+    "meal_timing_preference": "early" | "normal" | "late",
+    "spice_tolerance": "mild" | "medium" | "hot",
+    "cooking_method_preferences": ["grilled", "fried", "raw", "steamed"],
+    "ingredient_quality_preference": ["organic", "grass-fed", "local"],
+    "nutrition_goals": ["weight-loss", "muscle-gain", "maintenance"],
+    "allergen_concerns": [{"allergen": "string", "severity": "low" | "medium" | "high"}],
+    "texture_preferences": ["crunchy", "smooth", "chewy"]
+}
+
+Analyze implicit preferences, cultural context, and unstated dietary needs.
+Return only valid JSON, no explanation."""
+
+# The analysis schema uses short keys and optional entries so the model
+# emits roughly half the output tokens; _expand_analysis restores the
+# public dict shape locally
+_ANALYZE_ITEM_SYSTEM = """Analyze the given menu item description for detailed properties.
+
+Return compact JSON:
+{
+    "tags": {"hp": 0.0-1.0, "vg": 0.0-1.0, "gf": 0.0-1.0, "kt": 0.0-1.0, "ai": 0.0-1.0},
+    "np": {"p": "l|m|h", "c": "s|c|l", "f": "s|h|m"},
+    "cm": ["string"],
+    "al": {"c": ["string"], "f": ["string"]},
+    "mc": ["breakfast", "lunch", "dinner", "snack", "post_workout"],
+    "iq": ["organic", "grass_fed", "local", "processed"],
+    "ci": ["string"]
+}
+
+tags = dietary confidences (hp=high protein, vg=vegan, gf=gluten free,
+kt=keto friendly, ai=anti-inflammatory); omit tags with confidence < 0.2.
+np = nutrition profile (p=protein level, c=carb type, f=fat type).
+cm = cooking methods, al = allergens (c=contains, f=free from),
+mc = meal contexts, iq = ingredient quality, ci = cuisine influence.
+
+Return only valid JSON."""
+
+_ANALYSIS_TAG_KEYS = {
+    'hp': 'high_protein',
+    'vg': 'vegan',
+    'gf': 'gluten_free',
+    'kt': 'keto_friendly',
+    'ai': 'anti_inflammatory',
+}
+_ANALYSIS_PROTEIN_LEVELS = {'l': 'low', 'm': 'medium', 'h': 'high'}
+_ANALYSIS_CARB_TYPES = {'s': 'simple', 'c': 'complex', 'l': 'low'}
+_ANALYSIS_FAT_TYPES = {'s': 'saturated', 'h': 'healthy', 'm': 'mixed'}
+
+def _expand_analysis(compact: Dict[str, Any]) -> Dict[str, Any]:
+    """Expand the compact analysis schema back to the public dict shape"""
+    tags = compact.get('tags') or {}
+    profile = compact.get('np') or {}
+    allergens = compact.get('al') or {}
+    return {
+        "dietary_tags": {
+            name: {"confidence": float(tags.get(short) or 0.0)}
+            for short, name in _ANALYSIS_TAG_KEYS.items()
+        },
+        "nutrition_profile": {
+            "protein_level": _ANALYSIS_PROTEIN_LEVELS.get(profile.get('p'), 'medium'),
+            "carb_type": _ANALYSIS_CARB_TYPES.get(profile.get('c'), 'simple'),
+            "fat_type": _ANALYSIS_FAT_TYPES.get(profile.get('f'), 'mixed'),
+        },
+        "cooking_methods": compact.get('cm') or [],
+        "allergen_info": {
+            "contains": allergens.get('c') or [],
+            "free_from": allergens.get('f') or [],
+        },
+        "meal_contexts": compact.get('mc') or [],
+        "ingredient_quality": compact.get('iq') or [],
+        "cuisine_influence": compact.get('ci') or [],
+    }
+
+# TTLs for the exact-match prompt cache: extraction/analysis are
+# near-deterministic (temperature=0.1), response generation runs at
+# temperature=0.3 so recycle it for a shorter window
+_EXTRACTION_CACHE_TTL = 1800.0
+_RESPONSE_CACHE_TTL = 300.0
+
+# Semantic caches snapshot here so a restarted process serves warm hits
+# without re-embedding its recent query history
+_CACHE_DIR = Path(__file__).resolve().parents[2] / "cache"
+_CACHE_SAVE_INTERVAL = 60.0
+
+# Per-call Groq deadline and circuit-breaker tuning: after enough
+# consecutive failures the service answers from the mock paths for a
+# cooldown window instead of letting requests queue behind a stalled API
+_GROQ_TIMEOUT = 4.0
+_BREAKER_THRESHOLD = 5
+_BREAKER_COOLDOWN = 30.0
+
+class SemanticCache:
+    """Similarity cache for repetitive AI calls.
+
+    Food preference messages are highly repetitive ("healthy vegan under
+    $20", "quick lunch"), so a lookup that returns the payload of the
+    nearest cached embedding above a cosine threshold skips the entire
+    Groq round-trip. Entries expire by TTL and evict LRU-first.
+    """
+
+    def __init__(self, threshold: float = 0.9, max_entries: int = 10000, ttl_seconds: float = 300.0,
+                 path: Optional[Path] = None):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict = OrderedDict()  # id -> (timestamp, embedding, value)
+        self._next_id = 0
+        self._path = path
+        self._last_saved = time.time()
+        if path is not None:
+            self._load()
+
+    def _load(self) -> None:
+        """Restore a previous snapshot, dropping entries past their TTL"""
+        try:
+            with open(self._path, 'rb') as f:
+                entries, next_id = pickle.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.warning(f"Semantic cache load failed for {self._path}: {e}")
+            return
+        now = time.time()
+        self._entries = OrderedDict(
+            (key, entry) for key, entry in entries.items() if now - entry[0] <= self.ttl_seconds
+        )
+        self._next_id = next_id
+
+    def save(self) -> None:
+        """Snapshot entries to disk atomically (write temp file, then rename)"""
+        if self._path is None:
+            return
+        try:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self._path.with_suffix('.tmp')
+            with open(tmp, 'wb') as f:
+                pickle.dump((self._entries, self._next_id), f)
+            os.replace(tmp, self._path)
+            self._last_saved = time.time()
+        except Exception as e:
+            logger.warning(f"Semantic cache save failed for {self._path}: {e}")
+
+    def get(self, embedding: np.ndarray) -> Optional[Any]:
+        """Return the cached value nearest to embedding, or None on miss"""
+        now = time.time()
+        for key in [k for k, (ts, _, _) in self._entries.items() if now - ts > self.ttl_seconds]:
+            del self._entries[key]
+
+        if not self._entries:
+            return None
+
+        keys = list(self._entries)
+        matrix = np.stack([self._entries[k][1] for k in keys])
+        scores = matrix @ embedding  # cosine similarity (vectors are normalized)
+        best = int(np.argmax(scores))
+
+        if scores[best] >= self.threshold:
+            key = keys[best]
+            self._entries.move_to_end(key)
+            return self._entries[key][2]
+        return None
+
+    def put(self, embedding: np.ndarray, value: Any) -> None:
+        """Store a value under its embedding, evicting the oldest entry if full"""
+        if len(self._entries) >= self.max_entries:
+            self._entries.popitem(last=False)
+        self._entries[self._next_id] = (time.time(), embedding, value)
+        self._next_id += 1
+        # Piggyback persistence on writes so no background task is needed
+        if self._path is not None and time.time() - self._last_saved >= _CACHE_SAVE_INTERVAL:
+            self.save()
+
 class AIService:
     """Service for AI-powered text analysis and preference extraction"""
     
     def __init__(self):
         self.use_mock = settings.MOCK_DATA or not settings.GROQ_API_KEY
-        
+        # Bound concurrent Groq requests so batch fan-outs don't trip rate limits
+        self._sem = asyncio.Semaphore(10)
+
         if not self.use_mock:
-            self.client = AsyncGroq(api_key=settings.GROQ_API_KEY)
+            self.client = _get_groq_client()
             self.primary_model = "llama-3.1-8b-instant"  # Updated to current model
             self.fallback_model = "llama-3.1-8b-instant"
             self.speed_fallback = "mixtral-8x7b-32768"
+            # Structured extraction is a small-model task; JSON mode removes
+            # malformed-output retries
+            self.extract_model = "llama-3.1-8b-instant"
+            # Separate semantic caches per method so extraction hits never
+            # leak into menu analysis or response generation
+            self._prefs_semantic_cache = SemanticCache(path=_CACHE_DIR / "prefs_semantic.pkl")
+            self._analysis_semantic_cache = SemanticCache(path=_CACHE_DIR / "analysis_semantic.pkl")
+            self._response_semantic_cache = SemanticCache(path=_CACHE_DIR / "response_semantic.pkl")
+            # Exact-match cache on the rendered prompt, checked before the
+            # semantic layer so identical repeats never even embed
+            self._exact_cache: Dict[str, tuple] = {}
+            # Rolling failure count for the circuit breaker
+            self._breaker_fails = 0
+            self._breaker_opened_at = 0.0
             logger.info("AI Service initialized with Groq")
         else:
             logger.info("AI Service initialized with mock data")
-    
+
+    @staticmethod
+    def _exact_key(model: str, prompt: str) -> str:
+        """Build the exact-match cache key for a rendered prompt"""
+        return hashlib.sha256(f"{model}|{prompt}".encode()).hexdigest()
+
+    def _exact_get(self, key: str, ttl: float) -> Optional[Any]:
+        """Return a cached value if present and not expired"""
+        entry = self._exact_cache.get(key)
+        if entry is None:
+            return None
+        ts, value = entry
+        if time.time() - ts >= ttl:
+            del self._exact_cache[key]
+            return None
+        return value
+
+    def _exact_put(self, key: str, value: Any) -> None:
+        self._exact_cache[key] = (time.time(), value)
+
+    def _breaker_open(self) -> bool:
+        """True while the breaker is cooling down after repeated failures.
+
+        Once the cooldown elapses the next call probes Groq again
+        (half-open); a success resets the count, a failure re-opens.
+        """
+        return (
+            self._breaker_fails >= _BREAKER_THRESHOLD
+            and time.time() - self._breaker_opened_at < _BREAKER_COOLDOWN
+        )
+
+    def _record_failure(self) -> None:
+        self._breaker_fails += 1
+        if self._breaker_fails >= _BREAKER_THRESHOLD:
+            self._breaker_opened_at = time.time()
+            logger.warning("Groq circuit breaker open; serving mock responses for cooldown")
+
+    def _record_success(self) -> None:
+        self._breaker_fails = 0
+
+    def persist_caches(self) -> None:
+        """Flush the semantic caches to disk; call on app shutdown"""
+        if self.use_mock:
+            return
+        self._prefs_semantic_cache.save()
+        self._analysis_semantic_cache.save()
+        self._response_semantic_cache.save()
+
     async def extract_preferences(self, message: str, context: Optional[Dict[str, Any]] = None) -> ExtractedPreferences:
         """Extract structured preferences from user message"""
-        
+
         if self.use_mock:
             return await self._mock_extract_preferences(message, context)
-        else:
-            return await self._real_extract_preferences(message, context)
+
+        # The keyword rules run in microseconds; when they already cover a
+        # short message well there is nothing left for the LLM to add, so
+        # skip the Groq round trip entirely
+        prefs = await self._mock_extract_preferences(message, context)
+        if self._mock_coverage(prefs) >= 2 and len(message.split()) < 12:
+            return prefs
+
+        # While the breaker is open the keyword result stands in for Groq
+        if self._breaker_open():
+            return prefs
+
+        return await self._real_extract_preferences(message, context)
+
+    @staticmethod
+    def _mock_coverage(prefs: ExtractedPreferences) -> int:
+        """Count signal fields the keyword extractor filled with a non-default"""
+        return sum(
+            1 for field in ('budget', 'dietary_restrictions', 'urgency', 'health_priority')
+            if getattr(prefs, field) not in (None, 'medium', 'normal')
+        )
     
     async def analyze_menu_item(self, item_text: str) -> Dict[str, Any]:
         """Analyze menu item for dietary tags and properties"""
         
-        if self.use_mock:
+        if self.use_mock or self._breaker_open():
             return await self._mock_analyze_menu_item(item_text)
         else:
             return await self._real_analyze_menu_item(item_text)
     
+    async def analyze_menu_items_batch(self, item_texts: List[str]) -> List[Dict[str, Any]]:
+        """Analyze multiple menu items concurrently.
+
+        Fans the per-item calls out with asyncio.gather under a bounded
+        semaphore, so wall-clock time is ~one round-trip instead of N.
+        """
+
+        async def _analyze(text: str) -> Dict[str, Any]:
+            async with self._sem:
+                return await self.analyze_menu_item(text)
+
+        return await asyncio.gather(*[_analyze(text) for text in item_texts])
+
+    async def rank_items(self, query: str, item_texts: List[str]) -> List[float]:
+        """Score all items against a query concurrently instead of looping"""
+
+        if self.use_mock:
+            # Word-overlap ranking vectorizes; no reason to gather N coroutines
+            return self.rank_jaccard(query, item_texts).tolist()
+
+        async def _score(text: str) -> float:
+            async with self._sem:
+                return await self.semantic_similarity(query, text)
+
+        return await asyncio.gather(*[_score(text) for text in item_texts])
+
     async def semantic_similarity(self, query: str, item_text: str) -> float:
         """Calculate semantic similarity between query and item"""
         
@@ -53,32 +486,45 @@ class AIService:
     
     async def generate_response(self, user_message: str, extracted_prefs: ExtractedPreferences) -> str:
         """Generate conversational response"""
-        
-        if self.use_mock:
+
+        if self.use_mock or self._breaker_open():
             return "I found some great options that match your preferences! Let me show you the results."
         else:
             return await self._real_generate_response(user_message, extracted_prefs)
+
+    async def generate_response_stream(self, user_message: str, extracted_prefs: ExtractedPreferences) -> AsyncIterator[str]:
+        """Stream the conversational response as tokens arrive.
+
+        First token lands in ~100ms instead of waiting ~500ms for the full
+        completion; non-streaming callers use generate_response.
+        """
+        if self.use_mock or self._breaker_open():
+            yield "I found some great options that match your preferences! Let me show you the results."
+        else:
+            async for chunk in self._real_generate_response_stream(user_message, extracted_prefs):
+                yield chunk
     
     # Mock implementations for development
     async def _mock_extract_preferences(self, message: str, context: Optional[Dict[str, Any]] = None) -> ExtractedPreferences:
         """Mock preference extraction - simplified and robust"""
         
-        # Simple keyword-based mock extraction
+        # Simple keyword-based mock extraction; tokenize once so keyword
+        # checks are O(1) set intersections
         message_lower = message.lower()
-        
+        words = set(message_lower.split())
+
         mock_prefs = ExtractedPreferences()
-        
+
         # Budget detection
         if '$' in message:
-            import re
-            budget_match = re.search(r'\$(\d+)', message)
+            budget_match = _BUDGET_RE.search(message)
             if budget_match:
                 mock_prefs.budget = float(budget_match.group(1))
-        
+
         # Health priority
-        if any(word in message_lower for word in ['healthy', 'nutrition', 'clean']):
+        if words & _HEALTHY_KW:
             mock_prefs.health_priority = 'high'
-        elif any(word in message_lower for word in ['comfort', 'indulge']):
+        elif words & _COMFORT_KW:
             mock_prefs.health_priority = 'low'
         else:
             mock_prefs.health_priority = 'medium'
@@ -118,9 +564,9 @@ class AIService:
             mock_prefs.food_items = food_items
         
         # Urgency
-        if any(word in message_lower for word in ['quick', 'fast', 'asap']):
+        if words & _QUICK_KW:
             mock_prefs.urgency = 'high'
-        elif any(word in message_lower for word in ['slow', 'leisurely']):
+        elif words & _SLOW_KW:
             mock_prefs.urgency = 'low'
         else:
             mock_prefs.urgency = 'normal'
@@ -130,19 +576,19 @@ class AIService:
     async def _mock_analyze_menu_item(self, item_text: str) -> Dict[str, Any]:
         """Mock menu item analysis"""
         
-        item_lower = item_text.lower()
-        
+        hits = set(_ANALYZE_SCAN.findall(item_text.lower()))
+
         return {
             "dietary_tags": {
-                "high_protein": {"confidence": 0.8 if 'protein' in item_lower or 'beef' in item_lower else 0.2},
-                "vegan": {"confidence": 0.9 if 'vegan' in item_lower else 0.1},
-                "gluten_free": {"confidence": 0.7 if 'quinoa' in item_lower or 'rice' in item_lower else 0.3}
+                "high_protein": {"confidence": 0.8 if hits & _HIGH_PROTEIN_KW else 0.2},
+                "vegan": {"confidence": 0.9 if 'vegan' in hits else 0.1},
+                "gluten_free": {"confidence": 0.7 if hits & _GLUTEN_FREE_KW else 0.3}
             },
             "nutrition_profile": {
-                "protein_level": "high" if any(word in item_lower for word in ['beef', 'chicken', 'protein']) else "medium",
-                "carb_type": "complex" if 'quinoa' in item_lower else "simple"
+                "protein_level": "high" if hits & _PROTEIN_LEVEL_KW else "medium",
+                "carb_type": "complex" if 'quinoa' in hits else "simple"
             },
-            "cooking_methods": ["grilled" if 'grilled' in item_lower else "mixed"],
+            "cooking_methods": ["grilled" if 'grilled' in hits else "mixed"],
             "meal_contexts": ["lunch", "healthy"],
             "mock_analysis": True
         }
@@ -162,154 +608,233 @@ class AIService:
     # Real AI implementations
     async def _real_extract_preferences(self, message: str, context: Optional[Dict[str, Any]] = None) -> ExtractedPreferences:
         """Real preference extraction using DeepSeek-V3/Llama3"""
-        
-        context_str = json.dumps(context) if context else "{}"
-        prompt = f"""
-        Analyze this food preference message with deep reasoning:
-        Message: "{message}"
-        Context: {context_str}
-        
-        Extract comprehensive preferences and return valid JSON:
-        {{
-            "budget": number or null,
-            "health_priority": "low" | "medium" | "high",
-            "portion_preference": "small" | "medium" | "large" | "filling",
-            "dietary_restrictions": [{{"restriction": "string", "confidence": 0.0-1.0}}],
-            "cuisine_preferences": ["string"],
-            "urgency": "low" | "normal" | "high",
-            "emotional_context": "comfort" | "energy" | "social" | "celebration" | "stress",
-            "meal_timing_preference": "early" | "normal" | "late",
-            "spice_tolerance": "mild" | "medium" | "hot",
-            "cooking_method_preferences": ["grilled", "fried", "raw", "steamed"],
-            "ingredient_quality_preference": ["organic", "grass-fed", "local"],
-            "nutrition_goals": ["weight-loss", "muscle-gain", "maintenance"],
-            "allergen_concerns": [{{"allergen": "string", "severity": "low" | "medium" | "high"}}],
-            "texture_preferences": ["crunchy", "smooth", "chewy"]
-        }}
-        
-        Analyze implicit preferences, cultural context, and unstated dietary needs.
-        Return only valid JSON, no explanation.
-        """
-        
+
+        # orjson keeps the rendered context byte-stable (and is 2-5x faster),
+        # which matters for both cache keys and provider prefix reuse
+        context_str = orjson.dumps(context).decode() if context else "{}"
+        prompt = f'Message: "{message}"\nContext: {context_str}'
+
+        exact_key = self._exact_key(self.extract_model, prompt)
+        cached = self._exact_get(exact_key, _EXTRACTION_CACHE_TTL)
+        if cached is not None:
+            return cached
+
+        message_embedding = _embed(message)
+        cached = self._prefs_semantic_cache.get(message_embedding)
+        if cached is not None:
+            return cached
+
         try:
-            # Try primary model first
-            response = await self.client.chat.completions.create(
-                model=self.primary_model,  # Use updated Llama 3.1 model
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.1,
-                max_tokens=1024
-            )
-            
-            result = json.loads(response.choices[0].message.content.strip())
-            return ExtractedPreferences(**result)
-            
+            if settings.SPECULATIVE_EXTRACTION:
+                prefs = await self._speculative_extract(prompt)
+            else:
+                prefs = await self._extract_completion(self.extract_model, prompt)
+            self._record_success()
+            self._exact_put(exact_key, prefs)
+            self._prefs_semantic_cache.put(message_embedding, prefs)
+            return prefs
+
         except Exception as e:
             logger.error(f"AI preference extraction failed: {e}")
+            self._record_failure()
             # Fallback to mock
             return await self._mock_extract_preferences(message, context)
-    
+
+    async def _extract_completion(self, model: str, prompt: str) -> ExtractedPreferences:
+        """Run one extraction call and validate the result against the schema"""
+        response = await self.client.chat.completions.create(
+            model=model,
+            messages=[
+                {"role": "system", "content": _EXTRACT_PREFS_SYSTEM},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.1,
+            max_tokens=300,  # p95 of the schema fits well under this
+            response_format=_PREFS_RESPONSE_FORMAT,
+            timeout=_GROQ_TIMEOUT
+        )
+        return _PREFS_ADAPTER.validate_json(response.choices[0].message.content)
+
+    async def _speculative_extract(self, prompt: str) -> ExtractedPreferences:
+        """Race the instant model against Mixtral and keep the first valid parse.
+
+        Latency becomes min(t1, t2) instead of t1, which trims the tail when
+        one model's queue stalls; the loser is cancelled as soon as a
+        response validates. If the winner fails validation we fall through
+        to whatever the other task produces.
+        """
+        tasks = [
+            asyncio.ensure_future(self._extract_completion(self.extract_model, prompt)),
+            asyncio.ensure_future(self._extract_completion(self.speed_fallback, prompt)),
+        ]
+        try:
+            pending = set(tasks)
+            last_error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    try:
+                        return task.result()
+                    except Exception as e:
+                        last_error = e
+            raise last_error or RuntimeError("Speculative extraction produced no result")
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
     async def _real_analyze_menu_item(self, item_text: str) -> Dict[str, Any]:
         """Real menu item analysis using AI"""
-        
-        prompt = f"""
-        Analyze this menu item description for detailed properties:
-        Item: "{item_text}"
-        
-        Return JSON with analysis:
-        {{
-            "dietary_tags": {{
-                "high_protein": {{"confidence": 0.0-1.0, "reason": "string"}},
-                "vegan": {{"confidence": 0.0-1.0, "reason": "string"}},
-                "gluten_free": {{"confidence": 0.0-1.0, "reason": "string"}},
-                "keto_friendly": {{"confidence": 0.0-1.0, "reason": "string"}},
-                "anti_inflammatory": {{"confidence": 0.0-1.0, "reason": "string"}}
-            }},
-            "nutrition_profile": {{
-                "protein_level": "low" | "medium" | "high",
-                "carb_type": "simple" | "complex" | "low",
-                "fat_type": "saturated" | "healthy" | "mixed"
-            }},
-            "cooking_methods": ["string"],
-            "allergen_info": {{
-                "contains": ["string"],
-                "free_from": ["string"]
-            }},
-            "meal_contexts": ["breakfast", "lunch", "dinner", "snack", "post_workout"],
-            "ingredient_quality": ["organic", "grass_fed", "local", "processed"],
-            "cuisine_influence": ["string"]
-        }}
-        
-        Return only valid JSON.
-        """
-        
+
+        prompt = f'Item: "{item_text}"'
+
+        exact_key = self._exact_key(self.speed_fallback, prompt)
+        cached = self._exact_get(exact_key, _EXTRACTION_CACHE_TTL)
+        if cached is not None:
+            return cached
+
+        item_embedding = _embed(item_text)
+        cached = self._analysis_semantic_cache.get(item_embedding)
+        if cached is not None:
+            return cached
+
         try:
             response = await self.client.chat.completions.create(
                 model=self.speed_fallback,  # Use Mixtral for speed
-                messages=[{"role": "user", "content": prompt}],
+                messages=[
+                    {"role": "system", "content": _ANALYZE_ITEM_SYSTEM},
+                    {"role": "user", "content": prompt}
+                ],
                 temperature=0.1,
-                max_tokens=800
+                max_tokens=300,
+                response_format=_ANALYZE_RESPONSE_FORMAT,
+                timeout=_GROQ_TIMEOUT
             )
-            
-            return json.loads(response.choices[0].message.content.strip())
-            
+
+            compact = orjson.loads(response.choices[0].message.content)
+            analysis = _expand_analysis(compact)
+            self._record_success()
+            self._exact_put(exact_key, analysis)
+            self._analysis_semantic_cache.put(item_embedding, analysis)
+            return analysis
+
         except Exception as e:
             logger.error(f"AI menu analysis failed: {e}")
+            self._record_failure()
             return await self._mock_analyze_menu_item(item_text)
     
     async def _real_semantic_similarity(self, query: str, item_text: str) -> float:
-        """Real semantic similarity using AI"""
-        
-        prompt = f"""
-        Rate semantic similarity between user query and menu item (0.0 to 1.0):
-        
-        User Query: "{query}"
-        Menu Item: "{item_text}"
-        
-        Consider dietary preferences, cooking methods, nutritional goals, cuisine type.
-        Return only a number between 0.0 and 1.0.
+        """Semantic similarity via local MiniLM embeddings.
+
+        A single cosine over normalized embeddings runs in well under a
+        millisecond, versus ~300ms for the Groq call this replaces.
         """
-        
         try:
-            response = await self.client.chat.completions.create(
-                model=self.speed_fallback,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.1,
-                max_tokens=10
-            )
-            
-            similarity = float(response.choices[0].message.content.strip())
+            similarity = float(np.dot(_embed(query), _embed(item_text)))
             return max(0.0, min(1.0, similarity))  # Ensure bounds
-            
+
         except Exception as e:
-            logger.error(f"AI similarity calculation failed: {e}")
+            logger.error(f"Embedding similarity calculation failed: {e}")
             return await self._mock_semantic_similarity(query, item_text)
+
+    def rank(self, query: str, item_texts: List[str]) -> np.ndarray:
+        """Score all items against a query with one batched embedding pass.
+
+        One (1,384)x(N,384) matmul replaces N per-item similarity calls;
+        use this for bulk ranking and reserve the LLM for top-K judging.
+        """
+        model = _get_embedding_model()
+        query_emb = model.encode([query], normalize_embeddings=True)[0]
+        item_embs = model.encode(item_texts, batch_size=64, normalize_embeddings=True)
+        return item_embs @ query_emb
+
+    def rank_jaccard(self, query: str, item_texts: List[str]) -> np.ndarray:
+        """Keyword-overlap scores for a whole batch via 64-bit bitmaps.
+
+        The query vocabulary (capped at 64 terms) assigns one bit per
+        word, so per-item overlap reduces to a popcount over a bitwise
+        AND — microseconds for a 1000-item batch instead of N rounds of
+        Python set arithmetic.
+        """
+        vocab = {}
+        for word in query.lower().split():
+            if word not in vocab and len(vocab) < 64:
+                vocab[word] = len(vocab)
+
+        if not vocab:
+            return np.zeros(len(item_texts))
+
+        query_mask = _U64((1 << len(vocab)) - 1)
+        item_masks = np.zeros(len(item_texts), dtype=np.uint64)
+        for i, text in enumerate(item_texts):
+            mask = 0
+            for word in set(text.lower().split()):
+                bit = vocab.get(word)
+                if bit is not None:
+                    mask |= 1 << bit
+            item_masks[i] = mask
+
+        inter = _popcount64(item_masks & query_mask)
+        union = _popcount64(item_masks | query_mask)
+        return inter / union
     
     async def _real_generate_response(self, user_message: str, extracted_prefs: ExtractedPreferences) -> str:
-        """Generate conversational response"""
-        
+        """Generate conversational response by draining the streaming path"""
+        parts = [chunk async for chunk in self._real_generate_response_stream(user_message, extracted_prefs)]
+        return "".join(parts).strip()
+
+    async def _real_generate_response_stream(self, user_message: str, extracted_prefs: ExtractedPreferences) -> AsyncIterator[str]:
+        """Stream conversational response tokens from Groq"""
+
         prompt = f"""
         Generate a friendly, helpful response to this user message about food preferences.
-        
+
         User Message: "{user_message}"
         Extracted Preferences: {extracted_prefs.dict() if extracted_prefs else {}}
-        
+
         Acknowledge their preferences and let them know you're finding matching restaurants.
-        Keep it conversational and under 50 words.
+        Keep it conversational and under 40 words. Reply with a single paragraph.
         """
-        
+
+        exact_key = self._exact_key(self.speed_fallback, prompt)
+        cached = self._exact_get(exact_key, _RESPONSE_CACHE_TTL)
+        if cached is not None:
+            yield cached
+            return
+
+        message_embedding = _embed(user_message)
+        cached = self._response_semantic_cache.get(message_embedding)
+        if cached is not None:
+            yield cached
+            return
+
         try:
             response = await self.client.chat.completions.create(
                 model=self.speed_fallback,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.3,
-                max_tokens=100
+                max_tokens=60,  # 40 words comfortably fit
+                stop=["\n\n"],
+                stream=True,
+                timeout=_GROQ_TIMEOUT
             )
-            
-            return response.choices[0].message.content.strip()
-            
+
+            parts = []
+            async for chunk in response:
+                delta = chunk.choices[0].delta.content or ""
+                if delta:
+                    parts.append(delta)
+                    yield delta
+
+            reply = "".join(parts).strip()
+            self._record_success()
+            self._exact_put(exact_key, reply)
+            self._response_semantic_cache.put(message_embedding, reply)
+
         except Exception as e:
             logger.error(f"AI response generation failed: {e}")
-            return "I found some great options that match your preferences! Let me show you the results."
+            self._record_failure()
+            yield "I found some great options that match your preferences! Let me show you the results."
     
     async def process_search_refinement(self, refinement_message: str, current_filters: dict, current_results: list) -> dict:
         """Process user refinement of search results"""
@@ -392,5 +917,12 @@ class AIService:
             return await self._compare_with_groq(menu_items, criteria)
 
 
-# Global service instance
-ai_service = AIService()
+@functools.lru_cache(maxsize=1)
+def get_ai_service() -> AIService:
+    """Process-wide AIService, built on first use.
+
+    Lazy construction keeps import time free of client setup, and the
+    single instance means every caller shares the same caches and
+    circuit-breaker state.
+    """
+    return AIService()
@@ -2,28 +2,223 @@
 Enhanced AI Service with Tool Calling for Research and Menu Analysis
 """
 
-import json
+import functools
+import re
+import time
 import asyncio
-from typing import Dict, Any, List, Optional, Union
-from groq import AsyncGroq
+import hashlib
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field, replace
+from typing import Callable, Dict, Any, List, Optional
+import orjson
 from app.core.config import settings
-from app.models.user import ExtractedPreferences
-from app.services.menu_item_service import MenuItemService
+from app.models.menu_item import MenuItemSearchRequest
+from app.services.ai_service import _get_groq_client
+from app.services.menu_item_service import menu_item_service
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Keyword categories the pipeline branches on. The message is scanned once
+# with a compiled alternation and every later stage tests category
+# membership instead of re-sweeping the string
+_CATEGORY_KW = {
+    "protein": frozenset({"protein", "workout", "gym", "fitness"}),
+    "trending": frozenset({"popular", "trending", "best"}),
+    "plant": frozenset({"vegetarian", "vegan", "plant"}),
+    "budget": frozenset({"budget", "cheap", "affordable"}),
+}
+_KEYWORD_RE = re.compile(
+    r"\b(" + "|".join(sorted(set().union(*_CATEGORY_KW.values()))) + r")\b",
+    re.IGNORECASE,
+)
+
+def _message_categories(message: str) -> frozenset:
+    """Classify a message into keyword categories with a single scan"""
+    tokens = {token.lower() for token in _KEYWORD_RE.findall(message)}
+    return frozenset(name for name, keywords in _CATEGORY_KW.items() if tokens & keywords)
+
+@dataclass(slots=True)
+class EnhancedPrefs:
+    """Preferences the enhanced pipeline extracts and filters on.
+
+    A slots dataclass instead of a dict-of-Anys: attribute reads are
+    offset loads rather than hash lookups, the field set is explicit, and
+    asdict() covers the JSON/pydantic boundary.
+    """
+    health_priority: str = "medium"
+    dietary_restrictions: List[str] = field(default_factory=list)
+    budget: Optional[float] = None
+    urgency: str = "normal"
+    cuisine_preferences: List[str] = field(default_factory=list)
+    nutrition_goals: List[str] = field(default_factory=list)
+    min_protein: Optional[int] = None
+    max_price: Optional[float] = None
+    max_calories: Optional[int] = None
+
+# Response templates selected by category in priority order; only the
+# matched template renders, and the static ones cost a dict lookup
+_RESPONSE_TEMPLATES: Dict[str, Callable[[Dict[str, Any]], str]] = {
+    "protein": lambda r: (
+        "Perfect! I found high-protein options that align with your fitness goals. "
+        f"Based on my research, I'm showing dishes with "
+        f"{r.get('nutritional_analysis', {}).get('recommended_protein', '25g+')} protein "
+        "to fuel your workouts. These items are optimized for muscle recovery and growth."
+    ),
+    "plant": lambda r: (
+        "Excellent! I'm showing you delicious plant-based options with rich flavors and "
+        "complete nutrition. My research shows these items provide optimal protein "
+        "combinations and essential nutrients for a balanced vegetarian diet."
+    ),
+    "budget": lambda r: (
+        "I've found great value options that don't compromise on quality or taste. "
+        "Based on current market analysis, these items offer the best value in the "
+        f"{r.get('price_insights', {}).get('budget_range', '$10-15')} range."
+    ),
+    "trending": lambda r: (
+        "Great choice! I'm showing you the most popular and trending items right now. "
+        "These dishes are highly rated by customers and represent the best of what's "
+        "currently available in your area."
+    ),
+}
+_RESPONSE_PRIORITY = ("protein", "plant", "budget", "trending")
+_DEFAULT_RESPONSE = (
+    "I've found some amazing dishes based on your preferences and current research "
+    "insights! Swipe right on items you love, and I'll learn your taste preferences "
+    "to show better recommendations."
+)
+
+@functools.lru_cache(maxsize=128)
+def _derive_prefs(high_protein: bool, has_dietary: bool, has_price: bool,
+                  has_vegetarian: bool, has_vegan: bool) -> EnhancedPrefs:
+    """Derive preferences from the research flags; callers copy list fields"""
+    preferences = EnhancedPrefs()
+    if high_protein:
+        preferences.health_priority = "high"
+        preferences.nutrition_goals.append("muscle_gain")
+        preferences.min_protein = 25
+    if has_dietary:
+        if has_vegetarian:
+            preferences.dietary_restrictions.append("vegetarian")
+        if has_vegan:
+            preferences.dietary_restrictions.append("vegan")
+    if has_price:
+        preferences.max_price = 15
+        preferences.budget = 15
+    return preferences
+
+# Skeleton returned when no keyword bucket hit (the common chit-chat
+# case); callers get a fresh top-level dict, the empty values are shared
+# read-only
+_EMPTY_INSIGHTS = {
+    "nutritional_analysis": {},
+    "trending_items": [],
+    "dietary_recommendations": [],
+    "price_insights": {},
+    "restaurant_insights": {},
+}
+
+# Validated once at import; per-search requests are model_copy updates of
+# this template, skipping full nested validation on the hot path
+_DEFAULT_LOC = {"lat": 40.7580, "lng": -73.9855}
+_BASE_SEARCH_REQUEST = MenuItemSearchRequest(query="enhanced search", location=_DEFAULT_LOC)
+
+class LLMCache:
+    """TTL + LRU cache for full pipeline responses.
+
+    The mock branch is deterministic in its inputs and the real branch
+    runs near-deterministically at low temperature, so a repeat of the
+    same normalized request can skip the whole pipeline. Hit/miss counts
+    are kept for observability.
+    """
+
+    def __init__(self, max_entries: int = 2048, ttl_seconds: float = 3600.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict = OrderedDict()  # key -> (timestamp, value)
+        self.stats = {"hits": 0, "misses": 0}
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for key, or None on miss/expiry"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+        ts, value = entry
+        if time.time() - ts >= self.ttl_seconds:
+            del self._entries[key]
+            self.stats["misses"] += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return value
+
+    async def set(self, key: str, value: Any) -> None:
+        """Store a value, evicting least-recently-used entries when full"""
+        if len(self._entries) >= self.max_entries:
+            self._entries.popitem(last=False)
+        self._entries[key] = (time.time(), value)
+
+class _ToolMemo:
+    """Single-flight TTL memo for tool invocations.
+
+    Tool results are pure functions of small argument tuples and a large
+    share of invocations repeat, so entries hold the call's future: a
+    burst of identical calls awaits one execution instead of N, and later
+    repeats within the TTL return the settled result directly.
+    """
+
+    def __init__(self, max_entries: int = 4096, ttl_seconds: float = 600.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict = OrderedDict()  # key -> (timestamp, future)
+
+    async def run(self, key: tuple, factory) -> Any:
+        """Return the memoized result for key, running factory on a miss"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            ts, future = entry
+            if time.time() - ts < self.ttl_seconds:
+                self._entries.move_to_end(key)
+                # shield: one caller being cancelled must not kill the
+                # execution other callers are waiting on
+                return await asyncio.shield(future)
+            del self._entries[key]
+
+        if len(self._entries) >= self.max_entries:
+            self._entries.popitem(last=False)
+
+        future = asyncio.ensure_future(factory())
+        self._entries[key] = (time.time(), future)
+        try:
+            return await asyncio.shield(future)
+        except Exception:
+            self._entries.pop(key, None)  # never cache failures
+            raise
+
 class EnhancedAIService:
     """Enhanced AI service with tool calling capabilities for research and analysis"""
     
     def __init__(self):
         self.use_mock = settings.MOCK_DATA or not settings.GROQ_API_KEY
-        self.menu_service = MenuItemService()
+        # Shared module-level instance so per-service construction doesn't
+        # re-pay menu-service init
+        self.menu_service = menu_item_service
         
+        self._response_cache = LLMCache()
+        self._tool_memo = _ToolMemo()
+        # In-flight pipeline runs by cache key for single-flight dedup
+        self._inflight: Dict[str, asyncio.Task] = {}
+
         if not self.use_mock:
-            self.client = AsyncGroq(api_key=settings.GROQ_API_KEY)
+            # Shared process-wide client: one HTTP/2 pool serves this
+            # service and AIService, and main.py closes it on shutdown
+            self.client = _get_groq_client()
             self.primary_model = "llama-3.1-8b-instant"
             self.fallback_model = "llama-3.1-8b-instant"
+            # Bound concurrent completions so gather-based fan-outs stay
+            # inside provider rate limits
+            self._groq_sem = asyncio.Semaphore(settings.GROQ_MAX_CONCURRENCY)
             logger.info("Enhanced AI Service initialized with Groq")
         else:
             logger.info("Enhanced AI Service initialized with mock data")
@@ -36,220 +231,368 @@ class EnhancedAIService:
         chat_history: List[Dict[str, str]] = None
     ) -> Dict[str, Any]:
         """Enhanced conversational search with tool calling capabilities"""
-        
-        if self.use_mock:
-            return await self._mock_enhanced_search(message, user_id, context, chat_history)
-        else:
-            return await self._real_enhanced_search(message, user_id, context, chat_history)
+
+        normalized = message.strip().lower()
+        cache_key = self._cache_key(normalized, user_id, context)
+        cached = await self._response_cache.get(cache_key)
+        if cached is not None:
+            # isEnabledFor guard: stats render only when debug is on
+            if logger.isEnabledFor(logging.DEBUG):
+                stats = self._response_cache.stats
+                logger.debug("Enhanced search cache hit (%d hits / %d misses)",
+                             stats["hits"], stats["misses"])
+            return cached
+
+        # Concurrent duplicates (a burst of the same popular query) share
+        # one pipeline run instead of each starting their own
+        inflight = self._inflight.get(cache_key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        task = asyncio.ensure_future(
+            self._run_pipeline(message, normalized, user_id, context, chat_history)
+        )
+        self._inflight[cache_key] = task
+        try:
+            result = await asyncio.shield(task)
+        finally:
+            self._inflight.pop(cache_key, None)
+
+        await self._response_cache.set(cache_key, result)
+        return result
+
+    async def _run_pipeline(
+        self,
+        message: str,
+        normalized: str,
+        user_id: str,
+        context: Dict[str, Any],
+        chat_history: List[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """Dispatch one uncached pipeline run to the mock or real branch.
+
+        The whole run executes under a deadline so one slow external tool
+        can't hold the request past SLA; the endpoint surfaces the
+        TimeoutError like any other pipeline failure.
+        """
+        async with asyncio.timeout(settings.PIPELINE_BUDGET_SEC):
+            if self.use_mock:
+                return await self._mock_enhanced_search(message, normalized, user_id, context, chat_history)
+            return await self._real_enhanced_search(message, normalized, user_id, context, chat_history)
+
+    def _cache_key(self, normalized: str, user_id: str, context: Dict[str, Any]) -> str:
+        """Hash the inputs the pipeline actually varies on.
+
+        user_id is included because personalization feeds the item search;
+        chat history is not — neither branch reads it today.
+        """
+        payload = orjson.dumps({
+            "msg": normalized,
+            "user": user_id,
+            "loc": (context or {}).get("location"),
+            "meal": (context or {}).get("meal_context"),
+            "model": getattr(self, "primary_model", "mock"),
+        }, option=orjson.OPT_SORT_KEYS)
+        return hashlib.sha256(payload).hexdigest()
     
     async def _mock_enhanced_search(
-        self, 
-        message: str, 
-        user_id: str, 
+        self,
+        message: str,
+        normalized: str,
+        user_id: str,
         context: Dict[str, Any],
         chat_history: List[Dict[str, str]] = None
     ) -> Dict[str, Any]:
         """Mock enhanced search with simulated tool calling"""
-        
-        # Simulate tool calling for research
-        research_results = await self._mock_research_tools(message, context)
-        
-        # Extract preferences
-        preferences = await self._extract_preferences_with_tools(message, context, research_results)
-        
+
+        # Research and the standalone menu-research tool have no data
+        # dependency, so they start together; preferences and the item
+        # search still chain off the research results
+        categories = _message_categories(normalized)
+        menu_research_task = asyncio.create_task(
+            self.call_menu_research_tool(normalized, context.get("location") or {})
+        )
+
+        if categories:
+            research_results = await self._mock_research_tools(normalized, context, categories)
+            preferences = await self._extract_preferences_with_tools(normalized, context, research_results)
+        else:
+            # No keyword bucket hit, so research and extraction would only
+            # walk their default branches — skip both
+            research_results = dict(_EMPTY_INSIGHTS)
+            preferences = EnhancedPrefs()
+
         # Search menu items
         menu_items = await self._search_with_enhanced_filters(preferences, context, user_id)
-        
+
+        research_results["market_research"] = await menu_research_task
+
         # Generate enhanced response
-        ai_response = await self._generate_enhanced_response(message, preferences, menu_items, research_results)
+        ai_response = await self._generate_enhanced_response(preferences, menu_items, research_results, categories)
         
         return {
             "ai_response": ai_response,
             "menu_items": menu_items,
-            "preferences_extracted": preferences,
+            "preferences_extracted": asdict(preferences),
             "research_insights": research_results,
             "search_reasoning": f"Found {len(menu_items)} items based on your request and research insights",
             "tools_used": ["menu_research", "preference_analysis", "nutrition_analysis"]
         }
     
-    async def _mock_research_tools(self, message: str, context: Dict[str, Any]) -> Dict[str, Any]:
-        """Simulate research tools for menu analysis"""
-        
-        message_lower = message.lower()
-        insights = {
-            "nutritional_analysis": {},
-            "trending_items": [],
-            "dietary_recommendations": [],
-            "price_insights": {},
-            "restaurant_insights": {}
-        }
-        
-        # Simulate nutritional analysis
-        if any(word in message_lower for word in ['protein', 'workout', 'gym', 'fitness']):
-            insights["nutritional_analysis"] = {
+    async def _mock_research_tools(self, normalized: str, context: Dict[str, Any],
+                                   categories: Optional[frozenset] = None) -> Dict[str, Any]:
+        """Simulate research tools for menu analysis.
+
+        The four insight lookups are independent, so they fan out with
+        asyncio.gather — wall-clock time is the slowest lookup rather
+        than the sum of all four.
+        """
+
+        if categories is None:
+            categories = _message_categories(normalized)
+        if not categories:
+            return dict(_EMPTY_INSIGHTS)
+        keys = ("nutritional_analysis", "trending_items", "dietary_recommendations", "price_insights")
+        results = await asyncio.gather(
+            self._nutrition_insights(categories),
+            self._trending_insights(categories),
+            self._dietary_insights(categories),
+            self._price_insights(categories),
+            return_exceptions=True,
+        )
+
+        # Insights are best-effort enrichments: a failed lookup degrades
+        # to its empty default instead of failing the whole search
+        insights: Dict[str, Any] = {}
+        for name, result in zip(keys, results):
+            if isinstance(result, BaseException):
+                logger.warning("Research tool %s failed: %s", name, result)
+                insights[name] = _EMPTY_INSIGHTS[name]
+            else:
+                insights[name] = result
+        insights["restaurant_insights"] = {}
+        return insights
+
+    async def _nutrition_insights(self, categories: frozenset) -> Dict[str, Any]:
+        """Simulate nutritional analysis"""
+        if "protein" in categories:
+            return {
                 "focus": "high_protein",
                 "recommended_protein": "25-40g per meal",
                 "best_sources": ["grilled chicken", "salmon", "quinoa", "greek yogurt"]
             }
-        
-        # Simulate trending items
-        if any(word in message_lower for word in ['popular', 'trending', 'best']):
-            insights["trending_items"] = [
+        return {}
+
+    async def _trending_insights(self, categories: frozenset) -> List[str]:
+        """Simulate trending items"""
+        if "trending" in categories:
+            return [
                 "Protein Power Bowl",
-                "Truffle Mushroom Risotto", 
+                "Truffle Mushroom Risotto",
                 "Grilled Salmon",
                 "Quinoa Buddha Bowl"
             ]
-        
-        # Simulate dietary recommendations
-        if any(word in message_lower for word in ['vegetarian', 'vegan', 'plant']):
-            insights["dietary_recommendations"] = [
+        return []
+
+    async def _dietary_insights(self, categories: frozenset) -> List[str]:
+        """Simulate dietary recommendations"""
+        if "plant" in categories:
+            return [
                 "Focus on complete proteins like quinoa and beans",
                 "Include healthy fats from avocados and nuts",
                 "Ensure adequate B12 and iron intake"
             ]
-        
-        # Simulate price insights
-        if any(word in message_lower for word in ['budget', 'cheap', 'affordable']):
-            insights["price_insights"] = {
+        return []
+
+    async def _price_insights(self, categories: frozenset) -> Dict[str, Any]:
+        """Simulate price insights"""
+        if "budget" in categories:
+            return {
                 "budget_range": "$10-15",
                 "best_value_items": ["Grain Bowls", "Pasta Dishes", "Sandwiches"],
                 "splurge_worthy": ["Premium Proteins", "Artisanal Pizzas"]
             }
-        
-        return insights
+        return {}
     
     async def _extract_preferences_with_tools(
-        self, 
-        message: str, 
-        context: Dict[str, Any], 
+        self,
+        normalized: str,
+        context: Dict[str, Any],
         research_results: Dict[str, Any]
-    ) -> Dict[str, Any]:
-        """Extract preferences using research insights"""
-        
-        message_lower = message.lower()
-        preferences = {
-            "health_priority": "medium",
-            "dietary_restrictions": [],
-            "budget": None,
-            "urgency": "normal",
-            "cuisine_preferences": [],
-            "nutrition_goals": []
-        }
-        
-        # Enhanced preference extraction using research insights
-        if research_results.get("nutritional_analysis", {}).get("focus") == "high_protein":
-            preferences["health_priority"] = "high"
-            preferences["nutrition_goals"].append("muscle_gain")
-            preferences["min_protein"] = 25
-        
-        if research_results.get("dietary_recommendations"):
-            if "vegetarian" in message_lower:
-                preferences["dietary_restrictions"].append("vegetarian")
-            if "vegan" in message_lower:
-                preferences["dietary_restrictions"].append("vegan")
-        
-        if research_results.get("price_insights"):
-            preferences["max_price"] = 15
-            preferences["budget"] = 15
-        
-        return preferences
+    ) -> EnhancedPrefs:
+        """Extract preferences using research insights.
+
+        The output is a pure function of five booleans (at most 32
+        shapes), so the derivation is lru_cached; only fresh copies of
+        the mutable list fields are built per request.
+        """
+
+        cached = _derive_prefs(
+            research_results.get("nutritional_analysis", {}).get("focus") == "high_protein",
+            bool(research_results.get("dietary_recommendations")),
+            bool(research_results.get("price_insights")),
+            "vegetarian" in normalized,
+            "vegan" in normalized,
+        )
+        return replace(
+            cached,
+            dietary_restrictions=list(cached.dietary_restrictions),
+            cuisine_preferences=list(cached.cuisine_preferences),
+            nutrition_goals=list(cached.nutrition_goals),
+        )
     
     async def _search_with_enhanced_filters(
-        self, 
-        preferences: Dict[str, Any], 
-        context: Dict[str, Any], 
+        self,
+        preferences: EnhancedPrefs,
+        context: Dict[str, Any],
         user_id: str
     ) -> List[Dict[str, Any]]:
         """Search menu items with enhanced filtering"""
-        
+
         # Use the existing menu service but with enhanced filtering
-        from app.models.menu_item import MenuItemSearchRequest
-        
-        search_request = MenuItemSearchRequest(
-            query="enhanced search",
-            location=context.get("location", {"lat": 40.7580, "lng": -73.9855}),
-            filters={
-                "max_calories": preferences.get("max_calories"),
-                "min_protein": preferences.get("min_protein"),
-                "max_price": preferences.get("max_price"),
-                "dietary_restrictions": preferences.get("dietary_restrictions")
+        search_request = _BASE_SEARCH_REQUEST.model_copy(update={
+            "location": context.get("location", _DEFAULT_LOC),
+            "filters": {
+                "max_calories": preferences.max_calories,
+                "min_protein": preferences.min_protein,
+                "max_price": preferences.max_price,
+                "dietary_restrictions": preferences.dietary_restrictions
             },
-            personalization={
+            "personalization": {
                 "user_id": user_id,
-                "preferences": preferences,
+                "preferences": asdict(preferences),
                 "context": context.get("meal_context", "general")
             }
-        )
+        })
         
         response = await self.menu_service.search_menu_items(search_request)
-        return [item.model_dump() for item in response.menu_items]
+        # Dumping dozens of nested models is synchronous CPU work; run it
+        # off the event loop so concurrent gathered searches keep moving.
+        # exclude_none drops the many unset optional fields from each dict
+        return await asyncio.to_thread(
+            lambda: [item.model_dump(exclude_none=True) for item in response.menu_items]
+        )
     
     async def _generate_enhanced_response(
-        self, 
-        message: str, 
-        preferences: Dict[str, Any], 
-        menu_items: List[Dict[str, Any]], 
-        research_results: Dict[str, Any]
+        self,
+        preferences: EnhancedPrefs,
+        menu_items: List[Dict[str, Any]],
+        research_results: Dict[str, Any],
+        categories: frozenset
     ) -> str:
         """Generate enhanced AI response with research insights"""
-        
-        message_lower = message.lower()
-        
-        # Base response
-        if any(word in message_lower for word in ['protein', 'workout', 'gym', 'fitness']):
-            protein_insights = research_results.get("nutritional_analysis", {})
-            return f"Perfect! I found high-protein options that align with your fitness goals. Based on my research, I'm showing dishes with {protein_insights.get('recommended_protein', '25g+')} protein to fuel your workouts. These items are optimized for muscle recovery and growth."
-        
-        elif any(word in message_lower for word in ['vegetarian', 'vegan', 'plant']):
-            dietary_recs = research_results.get("dietary_recommendations", [])
-            return f"Excellent! I'm showing you delicious plant-based options with rich flavors and complete nutrition. My research shows these items provide optimal protein combinations and essential nutrients for a balanced vegetarian diet."
-        
-        elif any(word in message_lower for word in ['budget', 'cheap', 'affordable']):
-            price_insights = research_results.get("price_insights", {})
-            return f"I've found great value options that don't compromise on quality or taste. Based on current market analysis, these items offer the best value in the {price_insights.get('budget_range', '$10-15')} range."
-        
-        elif any(word in message_lower for word in ['popular', 'trending', 'best']):
-            trending = research_results.get("trending_items", [])
-            return f"Great choice! I'm showing you the most popular and trending items right now. These dishes are highly rated by customers and represent the best of what's currently available in your area."
-        
-        else:
-            return f"I've found some amazing dishes based on your preferences and current research insights! Swipe right on items you love, and I'll learn your taste preferences to show better recommendations."
+
+        for category in _RESPONSE_PRIORITY:
+            if category in categories:
+                return _RESPONSE_TEMPLATES[category](research_results)
+        return _DEFAULT_RESPONSE
     
     async def _real_enhanced_search(
-        self, 
-        message: str, 
-        user_id: str, 
+        self,
+        message: str,
+        normalized: str,
+        user_id: str,
         context: Dict[str, Any],
         chat_history: List[Dict[str, str]] = None
     ) -> Dict[str, Any]:
         """Real enhanced search with actual tool calling (when AI models are available)"""
-        
-        # This would implement real AI tool calling when models are working
-        # For now, fall back to mock implementation
-        return await self._mock_enhanced_search(message, user_id, context, chat_history)
+
+        categories = _message_categories(normalized)
+        research_results = await self._mock_research_tools(normalized, context, categories)
+        preferences = await self._extract_preferences_with_tools(normalized, context, research_results)
+
+        # The narrative depends only on preferences and research, not on
+        # the DB rows, so the menu search runs while Groq generates —
+        # total latency is max(search, completion) instead of their sum
+        menu_task = asyncio.create_task(
+            self._search_with_enhanced_filters(preferences, context, user_id)
+        )
+
+        try:
+            prompt = (
+                f'Reply to this food search message in under 40 words, '
+                f'acknowledging the preferences found.\n'
+                f'Message: "{message}"\n'
+                f'Preferences: {asdict(preferences)}'
+            )
+            ai_response = await self._groq_call(prompt, temperature=0.3, max_tokens=60)
+        except Exception as e:
+            logger.error("Enhanced response generation failed: %s", e)
+            ai_response = await self._generate_enhanced_response(preferences, [], research_results, categories)
+
+        menu_items = await menu_task
+
+        return {
+            "ai_response": ai_response,
+            "menu_items": menu_items,
+            "preferences_extracted": asdict(preferences),
+            "research_insights": research_results,
+            "search_reasoning": f"Found {len(menu_items)} items based on your request and research insights",
+            "tools_used": ["menu_research", "preference_analysis", "nutrition_analysis"]
+        }
+
+    async def _groq_call(self, prompt: str, model: Optional[str] = None, **kwargs) -> str:
+        """Run one completion under the concurrency bound.
+
+        Failures retry once on the fallback model before propagating, so a
+        transient 429/5xx on the primary doesn't sink a whole gather.
+        """
+        model = model or self.primary_model
+        async with self._groq_sem:
+            try:
+                response = await self.client.chat.completions.create(
+                    model=model,
+                    messages=[{"role": "user", "content": prompt}],
+                    **kwargs
+                )
+            except Exception as e:
+                logger.warning("Groq call on %s failed (%s); retrying on fallback", model, e)
+                response = await self.client.chat.completions.create(
+                    model=self.fallback_model,
+                    messages=[{"role": "user", "content": prompt}],
+                    **kwargs
+                )
+        return response.choices[0].message.content
     
-    # Tool calling methods for research
+    # Tool calling methods for research; each memoizes on its normalized
+    # arguments (coordinates rounded to ~100m) with single-flight dedup
     async def call_menu_research_tool(self, query: str, location: Dict[str, float]) -> Dict[str, Any]:
         """Tool for researching menu items and trends"""
+        key = (
+            "menu_research",
+            query.lower().strip(),
+            round(location.get("lat", 0.0), 3),
+            round(location.get("lng", 0.0), 3),
+        )
+        return await self._tool_memo.run(key, lambda: self._menu_research(query, location))
+
+    async def call_nutrition_analysis_tool(self, menu_item: str) -> Dict[str, Any]:
+        """Tool for analyzing nutrition content"""
+        key = ("nutrition_analysis", menu_item.lower().strip())
+        return await self._tool_memo.run(key, lambda: self._nutrition_analysis(menu_item))
+
+    async def call_restaurant_insights_tool(self, restaurant_name: str) -> Dict[str, Any]:
+        """Tool for getting restaurant insights"""
+        key = ("restaurant_insights", restaurant_name.lower().strip())
+        return await self._tool_memo.run(key, lambda: self._restaurant_insights(restaurant_name))
+
+    async def _menu_research(self, query: str, location: Dict[str, float]) -> Dict[str, Any]:
         # Simulate menu research
         return {
             "trending_items": ["Protein Power Bowl", "Truffle Mushroom Risotto"],
             "popular_cuisines": ["Mediterranean", "Asian Fusion"],
             "price_trends": {"average": 18.50, "range": "$12-25"}
         }
-    
-    async def call_nutrition_analysis_tool(self, menu_item: str) -> Dict[str, Any]:
-        """Tool for analyzing nutrition content"""
+
+    async def _nutrition_analysis(self, menu_item: str) -> Dict[str, Any]:
         # Simulate nutrition analysis
         return {
             "protein_content": "high" if "protein" in menu_item.lower() else "medium",
             "calorie_density": "moderate",
             "micronutrients": ["iron", "vitamin B12", "omega-3"]
         }
-    
-    async def call_restaurant_insights_tool(self, restaurant_name: str) -> Dict[str, Any]:
-        """Tool for getting restaurant insights"""
+
+    async def _restaurant_insights(self, restaurant_name: str) -> Dict[str, Any]:
         # Simulate restaurant research
         return {
             "rating": 4.5,
@@ -257,3 +600,13 @@ class EnhancedAIService:
             "price_level": "$$",
             "popular_items": ["Signature bowls", "Artisanal pizzas"]
         }
+
+
+@functools.lru_cache(maxsize=1)
+def get_enhanced_ai_service() -> EnhancedAIService:
+    """Process-wide EnhancedAIService, built on first use.
+
+    One instance means the response cache, tool memo and in-flight table
+    are shared by every request instead of reset per construction.
+    """
+    return EnhancedAIService()
@@ -1,11 +1,23 @@
 """
 Menu Item Service - Handles menu item search, filtering, and recommendations
 """
+import asyncio
+import base64
+import concurrent.futures
+import functools
+import heapq
 import json
+import logging
+import re
+import sys
 import time
 import struct
+from collections import OrderedDict
 from typing import List, Optional, Dict, Any
-from datetime import datetime
+
+import numpy as np
+import orjson
+from operator import attrgetter
 
 from ..models.menu_item import (
     MenuItem, 
@@ -15,13 +27,568 @@ from ..models.menu_item import (
     MenuItemInteraction
 )
 from ..core.config import settings
+from ..core.supabase import get_supabase_client, get_postgrest_client
+
+logger = logging.getLogger(__name__)
+
+
+# Tag and label literals repeated across the mock fixtures, interned so
+# every repetition references a single string object
+_HIGH_PROTEIN = sys.intern("High Protein")
+_GLUTEN_FREE = sys.intern("Gluten Free")
+_VEGETARIAN = sys.intern("Vegetarian")
+_VEGAN = sys.intern("Vegan")
+_ORGANIC = sys.intern("Organic")
+_BOWLS = sys.intern("bowls")
+_BREAKFAST = sys.intern("breakfast")
+_LUNCH = sys.intern("lunch")
+_DINNER = sys.intern("dinner")
+_GLUTEN = sys.intern("gluten")
+_DAIRY = sys.intern("dairy")
+_EGG = sys.intern("egg")
+_SOY = sys.intern("soy")
+_MILD = sys.intern("mild")
+_HEALTHY = sys.intern("healthy")
+_COMFORT = sys.intern("comfort")
+_ITALIAN = sys.intern("italian")
+_PRICE_LOW = sys.intern("$")
+_PRICE_MID = sys.intern("$$")
+
+
+def _relevance_key(item: MenuItem) -> float:
+    """Relevance sort key; unscored items rank as neutral"""
+    return item.popularity_score or 0.5
+
+
+def _score_plain(item: MenuItem) -> float:
+    return min(item.restaurant.rating / 5.0, 1.0)
+
+def _score_veg(item: MenuItem) -> float:
+    return min(item.restaurant.rating / 5.0
+               + (0.2 if 'vegetarian' in item.dietary_lower else 0.0), 1.0)
+
+def _score_postworkout(item: MenuItem) -> float:
+    return min(item.restaurant.rating / 5.0
+               + (0.3 if item.protein >= 25 else 0.0), 1.0)
+
+def _score_veg_postworkout(item: MenuItem) -> float:
+    return min(item.restaurant.rating / 5.0
+               + (0.2 if 'vegetarian' in item.dietary_lower else 0.0)
+               + (0.3 if item.protein >= 25 else 0.0), 1.0)
+
+# Specialized personalization scorers keyed by (vegetarian, post_workout);
+# picking one per request keeps user branches out of the per-item loop
+_SCORERS = {
+    (False, False): _score_plain,
+    (True, False): _score_veg,
+    (False, True): _score_postworkout,
+    (True, True): _score_veg_postworkout,
+}
+
+# Keyword-to-PostgREST-filter routing for search queries; matching is one
+# token-set intersection instead of a ladder of substring scans, and
+# _QUERY_PRIORITY decides the winner when several keywords appear
+_QUERY_DISPATCH = {
+    "pizza": 'name.ilike.%pizza%,inferred_meal_category.ilike.%pizza%',
+    "burger": 'name.ilike.%burger%,inferred_meal_category.ilike.%burger%',
+    "sushi": 'name.ilike.%sushi%,inferred_cuisine_type.ilike.%japanese%',
+    "chicken": 'name.ilike.%chicken%,description.ilike.%chicken%',
+    "salad": 'name.ilike.%salad%,inferred_meal_category.ilike.%salad%',
+    "healthy": 'inferred_health_tags.cs.{"healthy","low-calorie","high-protein"}',
+    "vegetarian": 'inferred_dietary_tags.cs.{"vegetarian","vegan"}',
+    "vegan": 'inferred_dietary_tags.cs.{"vegetarian","vegan"}',
+}
+_QUERY_KEYWORDS = frozenset(_QUERY_DISPATCH)
+_QUERY_PRIORITY = ("pizza", "burger", "sushi", "chicken", "salad",
+                   "healthy", "vegetarian", "vegan")
+
+# PostgREST metacharacters that would let free text escape an or_ filter
+_OR_UNSAFE = re.compile(r'[,()%]')
+
+# Human-readable labels for the filters echoed back in search metadata;
+# adding a filter label is a table entry, not a new branch
+_FILTER_LABELS = [
+    ("max_calories", "max_calories: {}".format),
+    ("min_protein", "min_protein: {}g".format),
+    ("dietary_restrictions", lambda v: f"dietary: {', '.join(v)}"),
+]
+
+# Restaurant columns fetched alongside menu items; hydrated in Python
+# from one batched IN query instead of a per-row PostgREST embed
+_RESTAURANT_COLUMNS = 'id,name,cuisine,price_level,rating,address,phone,location'
+
+# Price level 1-4 indexes straight into the tuple; anything else maps to '$$'
+_PRICE_RANGE = ('', '$', '$$', '$$$', '$$$$')
+
+_DEFAULT_ITEM_IMAGE = 'https://images.unsplash.com/photo-1512621776951-a57141f2eefd?w=400'
+
+# (MenuItem field, Supabase column, default) for the float conversions in
+# _convert_supabase_to_menu_item; one .get() per field instead of two
+_NUTRITION_FIELDS = (
+    ('price', 'price', 0.0),
+    ('protein', 'estimated_protein_g', 0.0),
+    ('carbs', 'estimated_carbs_g', 0.0),
+    ('fat', 'estimated_fat_g', 0.0),
+    ('fiber', 'estimated_fiber_g', None),
+    ('sugar', 'estimated_sugar_g', None),
+    ('sodium', 'estimated_sodium_mg', None),
+)
+
+@functools.lru_cache(maxsize=4096)
+def _parse_postgis_wkb(postgis_hex: str) -> Optional[tuple]:
+    """Parse one PostGIS WKB point hex string into (lng, lat)
+
+    Memoized on the raw hex: many menu items share a restaurant, so the
+    same location string recurs and only the first occurrence pays for
+    the hex decode and unpack.
+    """
+    try:
+        # Remove the '0101000020E6100000' prefix (SRID and geometry type)
+        binary_data = bytes.fromhex(postgis_hex[18:])
+        # Coordinates are two little-endian doubles
+        if len(binary_data) >= 16:
+            return struct.unpack('<dd', binary_data[:16])
+    except Exception as e:
+        logger.warning("Failed to parse PostGIS coordinates: %s", e)
+    return None
+
+
+# Sort fields that support keyset pagination, mapped to their Supabase
+# column and the MenuItem attribute carrying the same value
+_KEYSET_COLUMNS = {
+    "price": ("price", attrgetter("price")),
+    "calories": ("estimated_calories", attrgetter("calories")),
+    "protein": ("estimated_protein_g", attrgetter("protein")),
+}
+
+
+def _encode_cursor(value: Any, last_id: str) -> str:
+    """Pack a keyset position into an opaque base64 token"""
+    payload = json.dumps({"v": value, "id": last_id}).encode()
+    return base64.urlsafe_b64encode(payload).decode()
+
+
+def _decode_cursor(cursor: str) -> Optional[Dict[str, Any]]:
+    """Unpack a cursor token; malformed input degrades to no cursor"""
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return position if "v" in position and "id" in position else None
+    except (ValueError, KeyError):
+        return None
+
+
+# Sort-key dispatch built once at import; attrgetter's __call__ runs in C,
+# beating a per-request lambda on large result sets
+_SORT_KEYS = {
+    "price": attrgetter("price"),
+    "calories": attrgetter("calories"),
+    "protein": attrgetter("protein"),
+    "rating": attrgetter("restaurant.rating"),
+    "relevance": _relevance_key,
+}
+
+
+# Mock fixtures constructed once at import; the bytecode loader keeps
+# the tuple alive and every search reuses these instances instead of
+# re-running ten Pydantic validator chains
+_MOCK_MENU_ITEMS: tuple = (
+    MenuItem(
+        id="item-1",
+        name="Protein Power Bowl",
+        description="Quinoa bowl with grilled chicken, roasted vegetables, avocado, and tahini dressing",
+        image="https://images.unsplash.com/photo-1512621776951-a57141f2eefd?w=400",
+        restaurant=RestaurantInfo(
+            id="rest-1",
+            name="Green Fuel Kitchen",
+            cuisine="Healthy Bowls",
+            distance="0.3 mi",
+            rating=4.8,
+            price_range=_PRICE_MID,
+            address="123 Health St, NYC",
+            lat=40.758,
+            lng=-73.9855,
+            phone="(555) 123-4567"
+        ),
+        price=14.99,
+        calories=520,
+        protein=35.0,
+        carbs=42.0,
+        fat=18.0,
+        fiber=8.0,
+        sugar=6.0,
+        sodium=650.0,
+        dietary=[_HIGH_PROTEIN, _GLUTEN_FREE],
+        ingredients=["quinoa", "chicken breast", "avocado", "bell peppers", "tahini"],
+        allergens=["sesame"],
+        highlights=["35g protein", "Complete meal", "Post-workout friendly"],
+        category=_BOWLS,
+        preparation_time="12 min",
+        is_popular=True,
+        cuisine_tags=[_HEALTHY, "mediterranean"],
+        meal_time=[_LUNCH, "post-workout"]
+    ),
+    
+    MenuItem(
+        id="item-2", 
+        name="Vegan Buddha Bowl",
+        description="Colorful bowl with tempeh, roasted sweet potato, kale, edamame, and miso dressing",
+        image="https://images.unsplash.com/photo-1540420773420-3366772f4999?w=400",
+        restaurant=RestaurantInfo(
+            id="rest-2",
+            name="Plant Paradise",
+            cuisine=_VEGAN,
+            distance="0.5 mi", 
+            rating=4.6,
+            price_range=_PRICE_MID,
+            address="456 Green Ave, NYC",
+            lat=40.6782,
+            lng=-73.9442,
+            phone="(555) 234-5678"
+        ),
+        price=12.99,
+        calories=380,
+        protein=18.0,
+        carbs=52.0,
+        fat=12.0,
+        fiber=12.0,
+        sugar=14.0,
+        sodium=420.0,
+        dietary=[_VEGAN, _ORGANIC, _GLUTEN_FREE],
+        ingredients=["tempeh", "sweet potato", "kale", "edamame", "miso"],
+        allergens=[_SOY],
+        highlights=["Plant-based protein", "Antioxidant rich", "Organic ingredients"],
+        category=_BOWLS,
+        preparation_time="10 min",
+        is_popular=True,
+        cuisine_tags=["vegan", "asian-fusion"],
+        meal_time=[_LUNCH, _DINNER]
+    ),
+    
+    MenuItem(
+        id="item-3",
+        name="Classic Margherita Pizza",
+        description="Wood-fired pizza with fresh mozzarella, basil, and San Marzano tomato sauce",
+        image="https://images.unsplash.com/photo-1565299624946-b28f40a0ca4b?w=400",
+        restaurant=RestaurantInfo(
+            id="rest-3",
+            name="Nonna's Kitchen",
+            cuisine="Italian",
+            distance="0.7 mi",
+            rating=4.7,
+            price_range=_PRICE_MID,
+            address="789 Little Italy St, NYC",
+            lat=40.7282,
+            lng=-73.7949, 
+            phone="(555) 345-6789"
+        ),
+        price=16.99,
+        calories=680,
+        protein=28.0,
+        carbs=78.0,
+        fat=24.0,
+        fiber=4.0,
+        sugar=8.0,
+        sodium=1200.0,
+        dietary=[_VEGETARIAN],
+        ingredients=["mozzarella", "basil", "tomato sauce", "pizza dough", "olive oil"],
+        allergens=[_GLUTEN, _DAIRY],
+        highlights=["Wood-fired", "Fresh mozzarella", "Traditional recipe"],
+        category="pizza",
+        preparation_time="15 min",
+        is_popular=True,
+        cuisine_tags=[_ITALIAN, _COMFORT],
+        meal_time=[_LUNCH, _DINNER]
+    ),
+    
+    MenuItem(
+        id="item-4",
+        name="Acai Power Smoothie Bowl",
+        description="Thick acai smoothie topped with granola, fresh berries, coconut, and honey",
+        image="https://images.unsplash.com/photo-1571091718767-18b5b1457add?w=400",
+        restaurant=RestaurantInfo(
+            id="rest-4",
+            name="Sunrise Smoothies",
+            cuisine="Healthy Cafe",
+            distance="0.4 mi",
+            rating=4.5,
+            price_range=_PRICE_LOW,
+            address="321 Wellness Blvd, NYC",
+            lat=40.7505,
+            lng=-73.9934,
+            phone="(555) 456-7890"
+        ),
+        price=9.99,
+        calories=320,
+        protein=12.0,
+        carbs=48.0,
+        fat=10.0,
+        fiber=8.0,
+        sugar=28.0,
+        sodium=85.0,
+        dietary=[_VEGETARIAN, "Antioxidant Rich"],
+        ingredients=["acai", "banana", "granola", "blueberries", "coconut flakes"],
+        allergens=["nuts"],
+        highlights=["Antioxidant superfood", "Natural energy", "Refreshing"],
+        category=_BREAKFAST,
+        preparation_time="5 min",
+        is_popular=False,
+        cuisine_tags=[_HEALTHY, "tropical"],
+        meal_time=[_BREAKFAST, "pre-workout"]
+    ),
+    
+    MenuItem(
+        id="item-5",
+        name="Spicy Korean Bibimbap",
+        description="Mixed rice bowl with seasoned vegetables, beef bulgogi, fried egg, and gochujang",
+        image="https://images.unsplash.com/photo-1498654896293-37aacf113fd9?w=400",
+        restaurant=RestaurantInfo(
+            id="rest-5",
+            name="Seoul Kitchen", 
+            cuisine="Korean",
+            distance="0.8 mi",
+            rating=4.4,
+            price_range=_PRICE_MID,
+            address="654 K-Town Ave, NYC",
+            lat=40.7614,
+            lng=-73.9776,
+            phone="(555) 567-8901"
+        ),
+        price=15.99,
+        calories=620,
+        protein=32.0,
+        carbs=68.0,
+        fat=22.0,
+        fiber=6.0,
+        sugar=12.0,
+        sodium=980.0,
+        dietary=[_HIGH_PROTEIN, "Spicy"],
+        ingredients=["beef bulgogi", "rice", "spinach", "carrots", _EGG, "gochujang"],
+        allergens=[_GLUTEN, _SOY, _EGG],
+        highlights=["Korean BBQ flavor", "Complete meal", "Probiotic vegetables"],
+        category=_BOWLS,
+        preparation_time="18 min", 
+        is_popular=True,
+        cuisine_tags=["korean", "spicy", _COMFORT],
+        spice_level="medium",
+        meal_time=[_LUNCH, _DINNER]
+    ),
+    
+    MenuItem(
+        id="item-6",
+        name="Truffle Mushroom Risotto",
+        description="Creamy arborio rice with wild mushrooms, truffle oil, and parmesan cheese",
+        image="https://images.unsplash.com/photo-1476124369491-e7addf5db371?w=400",
+        restaurant=RestaurantInfo(
+            id="rest-6",
+            name="Bella Vista",
+            cuisine="Italian",
+            distance="0.6 mi",
+            rating=4.9,
+            price_range="$$$",
+            address="321 Little Italy, NYC",
+            lat=40.7505,
+            lng=-73.9934,
+            phone="(555) 678-9012"
+        ),
+        price=22.99,
+        calories=580,
+        protein=18.0,
+        carbs=72.0,
+        fat=24.0,
+        fiber=3.0,
+        sugar=4.0,
+        sodium=890.0,
+        dietary=[_VEGETARIAN, _GLUTEN_FREE],
+        ingredients=["arborio rice", "wild mushrooms", "truffle oil", "parmesan", "vegetable stock"],
+        allergens=[_DAIRY],
+        highlights=["Truffle infused", "Creamy texture", "Gourmet experience"],
+        category="pasta",
+        preparation_time="25 min",
+        is_popular=True,
+        cuisine_tags=[_ITALIAN, "gourmet", _COMFORT],
+        spice_level=_MILD,
+        meal_time=[_DINNER]
+    ),
+    
+    MenuItem(
+        id="item-7",
+        name="Avocado Toast Deluxe",
+        description="Sourdough toast with smashed avocado, cherry tomatoes, hemp seeds, and balsamic glaze",
+        image="https://images.unsplash.com/photo-1541519227354-08fa5d50c44d?w=400",
+        restaurant=RestaurantInfo(
+            id="rest-7",
+            name="Morning Glory Cafe",
+            cuisine="Breakfast",
+            distance="0.2 mi",
+            rating=4.3,
+            price_range=_PRICE_LOW,
+            address="789 Brunch St, NYC",
+            lat=40.7614,
+            lng=-73.9776,
+            phone="(555) 789-0123"
+        ),
+        price=8.99,
+        calories=320,
+        protein=12.0,
+        carbs=28.0,
+        fat=18.0,
+        fiber=8.0,
+        sugar=6.0,
+        sodium=420.0,
+        dietary=[_VEGETARIAN, "Healthy"],
+        ingredients=["sourdough bread", "avocado", "cherry tomatoes", "hemp seeds", "balsamic"],
+        allergens=[_GLUTEN],
+        highlights=["Healthy fats", "Fresh ingredients", "Instagram worthy"],
+        category=_BREAKFAST,
+        preparation_time="8 min",
+        is_popular=False,
+        cuisine_tags=[_HEALTHY, "brunch", "instagram"],
+        spice_level=_MILD,
+        meal_time=[_BREAKFAST, "brunch"]
+    ),
+    
+    MenuItem(
+        id="item-8",
+        name="Wagyu Beef Burger",
+        description="Premium wagyu beef patty with aged cheddar, caramelized onions, and truffle aioli",
+        image="https://images.unsplash.com/photo-1568901346375-23c9450c58cd?w=400",
+        restaurant=RestaurantInfo(
+            id="rest-8",
+            name="Burger Palace",
+            cuisine="American",
+            distance="0.9 mi",
+            rating=4.6,
+            price_range=_PRICE_MID,
+            address="456 Meat Ave, NYC",
+            lat=40.7505,
+            lng=-73.9934,
+            phone="(555) 890-1234"
+        ),
+        price=18.99,
+        calories=780,
+        protein=45.0,
+        carbs=52.0,
+        fat=42.0,
+        fiber=3.0,
+        sugar=8.0,
+        sodium=1200.0,
+        dietary=[_HIGH_PROTEIN],
+        ingredients=["wagyu beef", "aged cheddar", "caramelized onions", "truffle aioli", "brioche bun"],
+        allergens=[_GLUTEN, _DAIRY, _EGG],
+        highlights=["Premium wagyu", "Gourmet toppings", "Juicy patty"],
+        category="sandwiches",
+        preparation_time="15 min",
+        is_popular=True,
+        cuisine_tags=["american", "gourmet", _COMFORT],
+        spice_level=_MILD,
+        meal_time=[_LUNCH, _DINNER]
+    ),
+    
+    MenuItem(
+        id="item-9",
+        name="Chocolate Lava Cake",
+        description="Warm chocolate cake with molten center, vanilla ice cream, and berry compote",
+        image="https://images.unsplash.com/photo-1606313564200-e75d5e30476c?w=400",
+        restaurant=RestaurantInfo(
+            id="rest-9",
+            name="Sweet Dreams Desserts",
+            cuisine="Desserts",
+            distance="0.4 mi",
+            rating=4.7,
+            price_range=_PRICE_MID,
+            address="123 Sugar St, NYC",
+            lat=40.7614,
+            lng=-73.9776,
+            phone="(555) 901-2345"
+        ),
+        price=12.99,
+        calories=480,
+        protein=8.0,
+        carbs=65.0,
+        fat=22.0,
+        fiber=4.0,
+        sugar=52.0,
+        sodium=180.0,
+        dietary=[_VEGETARIAN],
+        ingredients=["dark chocolate", "butter", "eggs", "flour", "vanilla ice cream", "berries"],
+        allergens=[_GLUTEN, _DAIRY, _EGG],
+        highlights=["Molten center", "Rich chocolate", "Perfect temperature"],
+        category="desserts",
+        preparation_time="12 min",
+        is_popular=True,
+        cuisine_tags=["dessert", "chocolate", "indulgent"],
+        spice_level=_MILD,
+        meal_time=["dessert"]
+    ),
+    
+    MenuItem(
+        id="item-10",
+        name="Green Goddess Smoothie",
+        description="Spinach, kale, mango, banana, and coconut water blend with chia seeds",
+        image="https://images.unsplash.com/photo-1553530666-ba11a7da3888?w=400",
+        restaurant=RestaurantInfo(
+            id="rest-10",
+            name="Vitality Juice Bar",
+            cuisine="Healthy",
+            distance="0.3 mi",
+            rating=4.2,
+            price_range=_PRICE_LOW,
+            address="567 Wellness Way, NYC",
+            lat=40.7505,
+            lng=-73.9934,
+            phone="(555) 012-3456"
+        ),
+        price=7.99,
+        calories=180,
+        protein=6.0,
+        carbs=38.0,
+        fat=2.0,
+        fiber=8.0,
+        sugar=28.0,
+        sodium=85.0,
+        dietary=[_VEGAN, _GLUTEN_FREE, _ORGANIC],
+        ingredients=["spinach", "kale", "mango", "banana", "coconut water", "chia seeds"],
+        allergens=[],
+        highlights=["Superfood blend", "Natural energy", "Vitamin packed"],
+        category="beverages",
+        preparation_time="3 min",
+        is_popular=False,
+        cuisine_tags=[_HEALTHY, "vegan", "smoothie"],
+        spice_level=_MILD,
+        meal_time=[_BREAKFAST, "snack", "pre-workout"]
+    )
+
+)
+
+_MOCK_MENU_ITEMS_BY_ID = {item.id: item for item in _MOCK_MENU_ITEMS}
 
 
 class MenuItemService:
     """Service for menu item operations"""
-    
+
+    # Result sets below this aren't worth the array setup cost
+    _VECTORIZE_MIN_ROWS = 64
+
+    # Optimistically try the server-side search function; flips False on
+    # the first failure so undeployed databases pay one probe, not one
+    # per request
+    _search_rpc_available = True
+
+    # Liked-items cache bounds: bursts of refreshes for the same user
+    # within the TTL reuse one computed list
+    _LIKED_TTL = 60.0
+    _LIKED_MAX = 1024
+
+    # Coordinate decoding fans out to a thread pool above this row count,
+    # in chunks of _DECODE_CHUNK_ROWS; below it the handoff costs more
+    # than it saves
+    _DECODE_PARALLEL_MIN = 512
+    _DECODE_CHUNK_ROWS = 256
+
     def __init__(self):
         self.use_mock_data = settings.MOCK_DATA
+        self._liked_cache: OrderedDict = OrderedDict()  # user_id -> (timestamp, items)
+        self._decode_executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
     
     def _extract_coordinates_from_postgis(self, postgis_hex: str) -> Optional[Dict[str, float]]:
         """
@@ -30,24 +597,233 @@ class MenuItemService:
         """
         if not postgis_hex:
             return None
-        
+        coords = _parse_postgis_wkb(postgis_hex)
+        if coords is None:
+            return None
+        lng, lat = coords
+        return {"lat": lat, "lng": lng}
+
+    def _extract_coordinates_batch(self, hex_list: List[Optional[str]]) -> np.ndarray:
+        """
+        Decode a batch of PostGIS WKB point hex strings in one shot
+
+        The coordinate payloads are concatenated so hex decoding happens in
+        a single C call, then the buffer is reinterpreted as an (N, 2)
+        float64 array — column 0 is lng, column 1 is lat. Rows that are
+        missing or malformed come back as NaN.
+        """
+        coords = np.full((len(hex_list), 2), np.nan)
+        payloads = []
+        valid_rows = []
+        for row, postgis_hex in enumerate(hex_list):
+            # 18-char SRID/geometry-type prefix + 32 hex chars of lng/lat
+            if postgis_hex and len(postgis_hex) >= 50:
+                payloads.append(postgis_hex[18:50])
+                valid_rows.append(row)
+
+        if payloads:
+            try:
+                buffer = bytes.fromhex(''.join(payloads))
+                coords[valid_rows] = np.frombuffer(buffer, dtype='<f8').reshape(-1, 2)
+            except ValueError:
+                # A malformed entry poisons the joined decode; fall back to
+                # per-row parsing so the good rows still come through
+                for row in valid_rows:
+                    location = self._extract_coordinates_from_postgis(hex_list[row])
+                    if location:
+                        coords[row] = (location['lng'], location['lat'])
+
+        return coords
+
+    async def _extract_coordinates_async(self, hex_list: List[Optional[str]]) -> np.ndarray:
+        """Decode coordinates, fanning very large batches out to threads
+
+        bytes.fromhex and numpy's frombuffer release the GIL, so chunks of
+        big result sets decode in parallel on a small thread pool while
+        the event loop stays free; ordinary batches decode inline.
+        """
+        if len(hex_list) < self._DECODE_PARALLEL_MIN:
+            return self._extract_coordinates_batch(hex_list)
+
+        if self._decode_executor is None:
+            self._decode_executor = concurrent.futures.ThreadPoolExecutor(max_workers=2)
+        loop = asyncio.get_running_loop()
+        chunks = [hex_list[i:i + self._DECODE_CHUNK_ROWS]
+                  for i in range(0, len(hex_list), self._DECODE_CHUNK_ROWS)]
+        parts = await asyncio.gather(*[
+            loop.run_in_executor(self._decode_executor, self._extract_coordinates_batch, chunk)
+            for chunk in chunks
+        ])
+        return np.concatenate(parts)
+
+    async def _search_rows_via_rpc(self, request: MenuItemSearchRequest) -> Optional[List[dict]]:
+        """Run the search through the server-side function, if deployed
+
+        search_menu_items_flat (see search_menu_items_function.sql) does
+        the filtering, dedup and sort with one flat LEFT JOIN and returns
+        rows in the same shape as the hydrated embed. Free-text matching
+        there is a plain ilike, so keyword routing only applies on the
+        query-builder fallback.
+
+        The call goes straight to PostgREST over the shared httpx pool
+        with orjson on both sides, skipping the synchronous supabase
+        client and its stdlib json parse of the full page.
+        """
+        if request.cursor:
+            return None  # keyset cursors are handled by the builder path
+
+        filters = request.filters or {}
+        term = None
+        if request.query and request.query.strip():
+            term = _OR_UNSAFE.sub('', request.query.strip().lower())
         try:
-            # Remove the '0101000020E6100000' prefix (SRID and geometry type)
-            # and decode the hex string
-            hex_data = postgis_hex[18:]  # Remove the prefix
-            binary_data = bytes.fromhex(hex_data)
-            
-            # Parse the binary data to get coordinates
-            # PostGIS stores coordinates as double precision (8 bytes each)
-            if len(binary_data) >= 16:  # Need at least 16 bytes for lat/lng
-                # Unpack as little-endian doubles
-                lng, lat = struct.unpack('<dd', binary_data[:16])
-                return {"lat": lat, "lng": lng}
+            http = get_postgrest_client()
+            response = await http.post('/rpc/search_menu_items_flat', content=orjson.dumps({
+                'p_query': term,
+                'p_max_calories': filters.get('max_calories'),
+                'p_min_protein': filters.get('min_protein'),
+                'p_max_price': filters.get('max_price'),
+                'p_dietary': filters.get('dietary_restrictions'),
+                'p_categories': filters.get('categories'),
+                'p_allergen_free': filters.get('allergen_free'),
+                'p_sort': request.sort_by,
+                'p_desc': request.sort_order == "desc",
+                'p_limit': request.limit,
+                'p_offset': request.offset,
+            }))
+            response.raise_for_status()
+            return orjson.loads(response.content) or []
         except Exception as e:
-            print(f"Failed to parse PostGIS coordinates: {e}")
+            # Function not deployed (or incompatible); remember and serve
+            # everything through the query builder from here on
+            type(self)._search_rpc_available = False
+            logger.warning("search_menu_items_flat RPC unavailable, using query builder: %s", e)
+            return None
+
+    def _search_rows_via_query(self, client, request: MenuItemSearchRequest) -> List[dict]:
+        """Query-builder search path returning hydrated raw rows"""
+        # Build the query
+        query = client.table('menu_items').select('''
+            id, name, description, price, image_url,
+            estimated_calories, estimated_protein_g, estimated_carbs_g, estimated_fat_g,
+            estimated_fiber_g, estimated_sugar_g, estimated_sodium_mg,
+            inferred_dietary_tags, inferred_cuisine_type, inferred_health_tags,
+            inferred_spice_level, inferred_meal_category, inferred_cooking_methods,
+            inferred_allergens, tag_confidence, nutrition_confidence,
+            restaurant_id
+        ''')
+
+        # Apply semantic search and tagging
+        if request.query and request.query.strip():
+            original_query = request.query.strip()
+            translated_query = request.personalization.get('translated_query', '') if request.personalization else ''
+            
+            # Use semantic search with original query (for embeddings if available)
+            # For now, use intelligent keyword matching with original query
+            search_terms = original_query.lower()
+            
+            # If we have specific filters (like min_protein), prioritize those over text search
+            has_specific_filters = any([
+                request.filters.get('min_protein'),
+                request.filters.get('max_calories'),
+                request.filters.get('dietary_restrictions'),
+                request.filters.get('max_price')
+            ])
+            
+            if has_specific_filters and any(term in search_terms for term in ['high protein', 'protein', 'low calorie', 'healthy']):
+                # For generic health terms with specific filters, don't apply text search
+                # Let the filters do the work
+                pass
+            else:
+                # Route known food keywords through the prebuilt
+                # dispatch table in a single token-set intersection
+                hits = set(search_terms.split()) & _QUERY_KEYWORDS
+                if hits:
+                    keyword = next(k for k in _QUERY_PRIORITY if k in hits)
+                    query = query.or_(_QUERY_DISPATCH[keyword])
+                else:
+                    # General semantic search using name and description,
+                    # with metacharacters stripped so user text can't
+                    # inject extra filter clauses
+                    term = _OR_UNSAFE.sub('', search_terms)
+                    query = query.or_(f'name.ilike.%{term}%,description.ilike.%{term}%')
         
-        return None
+        # Apply filters
+        if request.filters:
+            if max_calories := request.filters.get('max_calories'):
+                query = query.lte('estimated_calories', max_calories)
+            if min_protein := request.filters.get('min_protein'):
+                query = query.gte('estimated_protein_g', min_protein)
+            if max_price := request.filters.get('max_price'):
+                query = query.lte('price', max_price)
+            if dietary_restrictions := request.filters.get('dietary_restrictions'):
+                # Use overlap operator for array fields
+                query = query.overlaps('inferred_dietary_tags', dietary_restrictions)
+            if categories := request.filters.get('categories'):
+                query = query.in_('inferred_meal_category', categories)
+            if allergen_free := request.filters.get('allergen_free'):
+                # Exclude items with these allergens
+                for allergen in allergen_free:
+                    query = query.not_.contains('inferred_allergens', [allergen])
+        
+        # Prioritize items with nutrition data (when not using mock data)
+        if not self.use_mock_data:
+            # Filter to items that have meaningful nutrition data (not null and not zero)
+            query = query.not_.is_('estimated_calories', 'null').gt('estimated_calories', 0)
         
+        # Apply sorting
+        if request.sort_by == "price":
+            query = query.order('price', desc=(request.sort_order == "desc"))
+        elif request.sort_by == "calories":
+            query = query.order('estimated_calories', desc=(request.sort_order == "desc"))
+        elif request.sort_by == "protein":
+            query = query.order('estimated_protein_g', desc=(request.sort_order == "desc"))
+        elif request.sort_by == "rating":
+            # Rating lives on the batched restaurants fetch, so the
+            # server can only give a stable order; _apply_sorting
+            # ranks the page by rating client-side
+            query = query.order('id')
+        else:  # relevance - prioritize items with nutrition data
+            # Order by nutrition confidence (items with data will have higher confidence)
+            query = query.order('nutrition_confidence', desc=True)
+            # Then by calories for items with data
+            query = query.order('estimated_calories', desc=True)
+        
+        # Apply pagination: a keyset cursor on a supported sort column
+        # seeks straight to the page (O(log N) at any depth), while
+        # offset ranges scan and discard everything before the page
+        keyset = _KEYSET_COLUMNS.get(request.sort_by)
+        position = _decode_cursor(request.cursor) if request.cursor and keyset else None
+        if position is not None:
+            column = keyset[0]
+            past = 'lt' if request.sort_order == "desc" else 'gt'
+            # Strictly past the last value, or equal value with id tiebreak
+            query = query.or_(
+                f"{column}.{past}.{position['v']},"
+                f"and({column}.eq.{position['v']},id.gt.{position['id']})"
+            )
+            query = query.order('id').limit(request.limit)
+        else:
+            query = query.range(request.offset, request.offset + request.limit - 1)
+        
+        # Execute query
+        response = query.execute()
+        rows = response.data
+
+        # Hydrate restaurants from one batched IN query; the nested
+        # restaurants(...) embed compiles to a LATERAL LEFT JOIN per
+        # row on the PostgREST side
+        restaurant_ids = list({row['restaurant_id'] for row in rows if row.get('restaurant_id')})
+        restaurants_by_id = {}
+        if restaurant_ids:
+            restaurants_response = client.table('restaurants').select(
+                _RESTAURANT_COLUMNS
+            ).in_('id', restaurant_ids).execute()
+            restaurants_by_id = {r['id']: r for r in restaurants_response.data}
+        for row in rows:
+            row['restaurants'] = restaurants_by_id.get(row.get('restaurant_id'), {})
+        return rows
+
     async def search_menu_items(self, request: MenuItemSearchRequest) -> MenuItemSearchResponse:
         """
         Search for menu items based on query, filters, and personalization
@@ -65,20 +841,34 @@ class MenuItemService:
         # Apply personalization and ranking
         ranked_items = await self._apply_personalization(filtered_items, request.personalization)
         
-        # Apply sorting and pagination
-        sorted_items = self._apply_sorting(ranked_items, request.sort_by, request.sort_order)
+        # Apply sorting and pagination; only the served page prefix needs
+        # ordering, so sorting can stop at offset + limit items
+        sorted_items = self._apply_sorting(ranked_items, request.sort_by, request.sort_order,
+                                           top_k=request.offset + request.limit)
         paginated_items = sorted_items[request.offset:request.offset + request.limit]
         
+        # Emit a keyset cursor for the next page when the sort field
+        # supports one and this page came back full
+        next_cursor = None
+        keyset = _KEYSET_COLUMNS.get(request.sort_by)
+        if keyset and paginated_items and len(paginated_items) == request.limit:
+            last_item = paginated_items[-1]
+            next_cursor = _encode_cursor(keyset[1](last_item), last_item.id)
+
         # Generate metadata
         search_time_ms = int((time.time() - start_time) * 1000)
         meta = self._generate_search_meta(
             total_results=len(filtered_items),
             search_time_ms=search_time_ms,
             request=request,
-            filtered_count=len(filtered_items)
+            filtered_count=len(filtered_items),
+            next_cursor=next_cursor
         )
         
-        return MenuItemSearchResponse(
+        # The wrapper only exists to be serialized: the items are already
+        # validated MenuItem instances and meta is a plain dict, so
+        # model_construct skips re-validating the whole page
+        return MenuItemSearchResponse.model_construct(
             menu_items=paginated_items,
             meta=meta
         )
@@ -86,71 +876,71 @@ class MenuItemService:
     async def get_menu_item_by_id(self, menu_item_id: str) -> Optional[MenuItem]:
         """Get a specific menu item by ID"""
         if self.use_mock_data:
-            mock_items = await self._get_mock_menu_items(MenuItemSearchRequest(
-                location={"lat": 40.7580, "lng": -73.9855}
-            ))
-            return next((item for item in mock_items if item.id == menu_item_id), None)
+            return _MOCK_MENU_ITEMS_BY_ID.get(menu_item_id)
         else:
             return await self._get_supabase_menu_item(menu_item_id)
     
     async def record_interaction(self, interaction: MenuItemInteraction) -> bool:
         """Record user interaction with a menu item"""
         if self.use_mock_data:
-            print(f"🎯 Mock: Recorded {interaction.action} for menu item {interaction.menu_item_id} by user {interaction.user_id}")
+            # %-style args defer formatting, and a queue-backed handler can
+            # move the write off the event loop entirely
+            logger.debug("Mock: recorded %s for menu item %s by user %s",
+                         interaction.action, interaction.menu_item_id, interaction.user_id)
             return True
         else:
             return await self._record_supabase_interaction(interaction)
     
     async def get_user_liked_items(self, user_id: str) -> List[MenuItem]:
-        """Get menu items liked by a user"""
+        """Get menu items liked by a user, cached per user for a minute"""
+        entry = self._liked_cache.get(user_id)
+        if entry is not None:
+            timestamp, items = entry
+            if time.time() - timestamp < self._LIKED_TTL:
+                self._liked_cache.move_to_end(user_id)
+                return items
+            del self._liked_cache[user_id]
+
         if self.use_mock_data:
             # Return a subset of mock items as "liked"
             mock_items = await self._get_mock_menu_items(MenuItemSearchRequest(
                 location={"lat": 40.7580, "lng": -73.9855}
             ))
-            return mock_items[:3]  # Return first 3 as liked items
+            items = mock_items[:3]  # Return first 3 as liked items
         else:
-            return await self._get_supabase_liked_items(user_id)
+            items = await self._get_supabase_liked_items(user_id)
+
+        if len(self._liked_cache) >= self._LIKED_MAX:
+            self._liked_cache.popitem(last=False)
+        self._liked_cache[user_id] = (time.time(), items)
+        return items
     
     def _apply_filters(self, menu_items: List[MenuItem], filters: Dict[str, Any]) -> List[MenuItem]:
-        """Apply filters to menu items list"""
+        """Apply filters to menu items in one fused pass"""
         if not filters:
             return menu_items
-        
-        filtered = menu_items
-        
-        # Nutrition filters
-        if max_calories := filters.get('max_calories'):
-            filtered = [item for item in filtered if item.calories <= max_calories]
-        
-        if min_protein := filters.get('min_protein'):
-            filtered = [item for item in filtered if item.protein >= min_protein]
-        
-        if max_price := filters.get('max_price'):
-            filtered = [item for item in filtered if item.price <= max_price]
-        
-        # Dietary restrictions
-        if dietary_restrictions := filters.get('dietary_restrictions'):
-            filtered = [
-                item for item in filtered 
-                if any(diet.lower() in [d.lower() for d in item.dietary] for diet in dietary_restrictions)
-            ]
-        
-        # Categories
-        if categories := filters.get('categories'):
-            filtered = [
-                item for item in filtered 
-                if item.category.lower() in [c.lower() for c in categories]
-            ]
-        
-        # Allergen-free
-        if allergen_free := filters.get('allergen_free'):
-            filtered = [
-                item for item in filtered
-                if not any(allergen.lower() in [a.lower() for a in item.allergens] for allergen in allergen_free)
-            ]
-        
-        return filtered
+
+        # Normalize filter values once; absent filters short-circuit per
+        # item instead of each materializing its own intermediate list
+        max_calories = filters.get('max_calories')
+        min_protein = filters.get('min_protein')
+        max_price = filters.get('max_price')
+        dietary_restrictions = filters.get('dietary_restrictions')
+        wanted_diets = frozenset(d.lower() for d in dietary_restrictions) if dietary_restrictions else None
+        categories = filters.get('categories')
+        wanted_categories = frozenset(c.lower() for c in categories) if categories else None
+        allergen_free = filters.get('allergen_free')
+        wanted_allergens = frozenset(a.lower() for a in allergen_free) if allergen_free else None
+
+        return [
+            item for item in menu_items
+            if (not max_calories or item.calories <= max_calories)
+            and (not min_protein or item.protein >= min_protein)
+            and (not max_price or item.price <= max_price)
+            and (wanted_diets is None or item.dietary_lower & wanted_diets)
+            and (wanted_categories is None or item.category_lower in wanted_categories)
+            and (wanted_allergens is None or item.allergens_lower.isdisjoint(wanted_allergens))
+        ]
     
     async def _apply_personalization(self, menu_items: List[MenuItem], personalization: Dict[str, Any]) -> List[MenuItem]:
         """Apply personalization and scoring to menu items"""
@@ -160,49 +950,42 @@ class MenuItemService:
         # For mock data, just return items as-is with some basic scoring logic
         user_preferences = personalization.get('preferences', {})
         context = personalization.get('context', '')
-        
-        # Simple mock personalization logic
+
+        # Pick the specialized scorer for this user once; the loop body is
+        # then a single call with no per-item branching
+        want_veg = user_preferences.get('dietary') == 'vegetarian'
+        want_postworkout = context == 'post_workout'
+        score_item = _SCORERS[(want_veg, want_postworkout)]
+
         for item in menu_items:
-            base_score = item.restaurant.rating / 5.0  # Normalize rating to 0-1
-            
-            # Boost based on dietary preferences
-            if user_preferences.get('dietary') == 'vegetarian' and 'vegetarian' in [d.lower() for d in item.dietary]:
-                base_score += 0.2
-            
-            # Boost based on context
-            if context == 'post_workout' and item.protein >= 25:
-                base_score += 0.3
-            
             # Store score for sorting (we'll add this to the model later)
-            item.popularity_score = min(base_score, 1.0)
-        
+            item.popularity_score = score_item(item)
+
         return menu_items
     
-    def _apply_sorting(self, menu_items: List[MenuItem], sort_by: str, sort_order: str) -> List[MenuItem]:
-        """Apply sorting to menu items"""
+    def _apply_sorting(self, menu_items: List[MenuItem], sort_by: str, sort_order: str,
+                       top_k: Optional[int] = None) -> List[MenuItem]:
+        """Apply sorting to menu items, optionally keeping only top_k
+
+        When a caller needs just a small page prefix of a large list, a
+        bounded heap selection (O(N log K)) replaces the full O(N log N)
+        sort.
+        """
         reverse = sort_order == "desc"
-        
-        if sort_by == "price":
-            return sorted(menu_items, key=lambda x: x.price, reverse=reverse)
-        elif sort_by == "calories":
-            return sorted(menu_items, key=lambda x: x.calories, reverse=reverse)
-        elif sort_by == "protein":
-            return sorted(menu_items, key=lambda x: x.protein, reverse=reverse)
-        elif sort_by == "rating":
-            return sorted(menu_items, key=lambda x: x.restaurant.rating, reverse=reverse)
-        else:  # relevance
-            return sorted(menu_items, key=lambda x: x.popularity_score or 0.5, reverse=reverse)
+        key = _SORT_KEYS.get(sort_by, _relevance_key)
+        if top_k is not None and top_k < len(menu_items) / 2:
+            select = heapq.nlargest if reverse else heapq.nsmallest
+            return select(top_k, menu_items, key=key)
+        return sorted(menu_items, key=key, reverse=reverse)
     
-    def _generate_search_meta(self, total_results: int, search_time_ms: int, request: MenuItemSearchRequest, filtered_count: int) -> Dict[str, Any]:
+    def _generate_search_meta(self, total_results: int, search_time_ms: int, request: MenuItemSearchRequest,
+                              filtered_count: int, next_cursor: Optional[str] = None) -> Dict[str, Any]:
         """Generate search metadata"""
-        filters_applied = []
-        if request.filters:
-            if 'max_calories' in request.filters:
-                filters_applied.append(f"max_calories: {request.filters['max_calories']}")
-            if 'min_protein' in request.filters:
-                filters_applied.append(f"min_protein: {request.filters['min_protein']}g")
-            if 'dietary_restrictions' in request.filters:
-                filters_applied.append(f"dietary: {', '.join(request.filters['dietary_restrictions'])}")
+        filters = request.filters
+        filters_applied = [
+            label(filters[key]) for key, label in _FILTER_LABELS
+            if filters and key in filters
+        ]
         
         # Generate personalization reason
         reason = "Showing popular menu items in your area"
@@ -222,564 +1005,178 @@ class MenuItemService:
             "personalization_score": 0.85,  # Mock score
             "filters_applied": filters_applied,
             "recommendations_reason": reason,
+            "next_cursor": next_cursor,
             "mock_data": self.use_mock_data
         }
     
     async def _get_mock_menu_items(self, request: MenuItemSearchRequest) -> List[MenuItem]:
-        """Generate mock menu items for testing"""
-        
-        return [
-            MenuItem(
-                id="item-1",
-                name="Protein Power Bowl",
-                description="Quinoa bowl with grilled chicken, roasted vegetables, avocado, and tahini dressing",
-                image="https://images.unsplash.com/photo-1512621776951-a57141f2eefd?w=400",
-                restaurant=RestaurantInfo(
-                    id="rest-1",
-                    name="Green Fuel Kitchen",
-                    cuisine="Healthy Bowls",
-                    distance="0.3 mi",
-                    rating=4.8,
-                    price_range="$$",
-                    address="123 Health St, NYC",
-                    lat=40.758,
-                    lng=-73.9855,
-                    phone="(555) 123-4567"
-                ),
-                price=14.99,
-                calories=520,
-                protein=35.0,
-                carbs=42.0,
-                fat=18.0,
-                fiber=8.0,
-                sugar=6.0,
-                sodium=650.0,
-                dietary=["High Protein", "Gluten Free"],
-                ingredients=["quinoa", "chicken breast", "avocado", "bell peppers", "tahini"],
-                allergens=["sesame"],
-                highlights=["35g protein", "Complete meal", "Post-workout friendly"],
-                category="bowls",
-                preparation_time="12 min",
-                is_popular=True,
-                cuisine_tags=["healthy", "mediterranean"],
-                meal_time=["lunch", "post-workout"]
-            ),
-            
-            MenuItem(
-                id="item-2", 
-                name="Vegan Buddha Bowl",
-                description="Colorful bowl with tempeh, roasted sweet potato, kale, edamame, and miso dressing",
-                image="https://images.unsplash.com/photo-1540420773420-3366772f4999?w=400",
-                restaurant=RestaurantInfo(
-                    id="rest-2",
-                    name="Plant Paradise",
-                    cuisine="Vegan",
-                    distance="0.5 mi", 
-                    rating=4.6,
-                    price_range="$$",
-                    address="456 Green Ave, NYC",
-                    lat=40.6782,
-                    lng=-73.9442,
-                    phone="(555) 234-5678"
-                ),
-                price=12.99,
-                calories=380,
-                protein=18.0,
-                carbs=52.0,
-                fat=12.0,
-                fiber=12.0,
-                sugar=14.0,
-                sodium=420.0,
-                dietary=["Vegan", "Organic", "Gluten Free"],
-                ingredients=["tempeh", "sweet potato", "kale", "edamame", "miso"],
-                allergens=["soy"],
-                highlights=["Plant-based protein", "Antioxidant rich", "Organic ingredients"],
-                category="bowls",
-                preparation_time="10 min",
-                is_popular=True,
-                cuisine_tags=["vegan", "asian-fusion"],
-                meal_time=["lunch", "dinner"]
-            ),
-            
-            MenuItem(
-                id="item-3",
-                name="Classic Margherita Pizza",
-                description="Wood-fired pizza with fresh mozzarella, basil, and San Marzano tomato sauce",
-                image="https://images.unsplash.com/photo-1565299624946-b28f40a0ca4b?w=400",
-                restaurant=RestaurantInfo(
-                    id="rest-3",
-                    name="Nonna's Kitchen",
-                    cuisine="Italian",
-                    distance="0.7 mi",
-                    rating=4.7,
-                    price_range="$$",
-                    address="789 Little Italy St, NYC",
-                    lat=40.7282,
-                    lng=-73.7949, 
-                    phone="(555) 345-6789"
-                ),
-                price=16.99,
-                calories=680,
-                protein=28.0,
-                carbs=78.0,
-                fat=24.0,
-                fiber=4.0,
-                sugar=8.0,
-                sodium=1200.0,
-                dietary=["Vegetarian"],
-                ingredients=["mozzarella", "basil", "tomato sauce", "pizza dough", "olive oil"],
-                allergens=["gluten", "dairy"],
-                highlights=["Wood-fired", "Fresh mozzarella", "Traditional recipe"],
-                category="pizza",
-                preparation_time="15 min",
-                is_popular=True,
-                cuisine_tags=["italian", "comfort"],
-                meal_time=["lunch", "dinner"]
-            ),
-            
-            MenuItem(
-                id="item-4",
-                name="Acai Power Smoothie Bowl",
-                description="Thick acai smoothie topped with granola, fresh berries, coconut, and honey",
-                image="https://images.unsplash.com/photo-1571091718767-18b5b1457add?w=400",
-                restaurant=RestaurantInfo(
-                    id="rest-4",
-                    name="Sunrise Smoothies",
-                    cuisine="Healthy Cafe",
-                    distance="0.4 mi",
-                    rating=4.5,
-                    price_range="$",
-                    address="321 Wellness Blvd, NYC",
-                    lat=40.7505,
-                    lng=-73.9934,
-                    phone="(555) 456-7890"
-                ),
-                price=9.99,
-                calories=320,
-                protein=12.0,
-                carbs=48.0,
-                fat=10.0,
-                fiber=8.0,
-                sugar=28.0,
-                sodium=85.0,
-                dietary=["Vegetarian", "Antioxidant Rich"],
-                ingredients=["acai", "banana", "granola", "blueberries", "coconut flakes"],
-                allergens=["nuts"],
-                highlights=["Antioxidant superfood", "Natural energy", "Refreshing"],
-                category="breakfast",
-                preparation_time="5 min",
-                is_popular=False,
-                cuisine_tags=["healthy", "tropical"],
-                meal_time=["breakfast", "pre-workout"]
-            ),
-            
-            MenuItem(
-                id="item-5",
-                name="Spicy Korean Bibimbap",
-                description="Mixed rice bowl with seasoned vegetables, beef bulgogi, fried egg, and gochujang",
-                image="https://images.unsplash.com/photo-1498654896293-37aacf113fd9?w=400",
-                restaurant=RestaurantInfo(
-                    id="rest-5",
-                    name="Seoul Kitchen", 
-                    cuisine="Korean",
-                    distance="0.8 mi",
-                    rating=4.4,
-                    price_range="$$",
-                    address="654 K-Town Ave, NYC",
-                    lat=40.7614,
-                    lng=-73.9776,
-                    phone="(555) 567-8901"
-                ),
-                price=15.99,
-                calories=620,
-                protein=32.0,
-                carbs=68.0,
-                fat=22.0,
-                fiber=6.0,
-                sugar=12.0,
-                sodium=980.0,
-                dietary=["High Protein", "Spicy"],
-                ingredients=["beef bulgogi", "rice", "spinach", "carrots", "egg", "gochujang"],
-                allergens=["gluten", "soy", "egg"],
-                highlights=["Korean BBQ flavor", "Complete meal", "Probiotic vegetables"],
-                category="bowls",
-                preparation_time="18 min", 
-                is_popular=True,
-                cuisine_tags=["korean", "spicy", "comfort"],
-                spice_level="medium",
-                meal_time=["lunch", "dinner"]
-            ),
-            
-            MenuItem(
-                id="item-6",
-                name="Truffle Mushroom Risotto",
-                description="Creamy arborio rice with wild mushrooms, truffle oil, and parmesan cheese",
-                image="https://images.unsplash.com/photo-1476124369491-e7addf5db371?w=400",
-                restaurant=RestaurantInfo(
-                    id="rest-6",
-                    name="Bella Vista",
-                    cuisine="Italian",
-                    distance="0.6 mi",
-                    rating=4.9,
-                    price_range="$$$",
-                    address="321 Little Italy, NYC",
-                    lat=40.7505,
-                    lng=-73.9934,
-                    phone="(555) 678-9012"
-                ),
-                price=22.99,
-                calories=580,
-                protein=18.0,
-                carbs=72.0,
-                fat=24.0,
-                fiber=3.0,
-                sugar=4.0,
-                sodium=890.0,
-                dietary=["Vegetarian", "Gluten Free"],
-                ingredients=["arborio rice", "wild mushrooms", "truffle oil", "parmesan", "vegetable stock"],
-                allergens=["dairy"],
-                highlights=["Truffle infused", "Creamy texture", "Gourmet experience"],
-                category="pasta",
-                preparation_time="25 min",
-                is_popular=True,
-                cuisine_tags=["italian", "gourmet", "comfort"],
-                spice_level="mild",
-                meal_time=["dinner"]
-            ),
-            
-            MenuItem(
-                id="item-7",
-                name="Avocado Toast Deluxe",
-                description="Sourdough toast with smashed avocado, cherry tomatoes, hemp seeds, and balsamic glaze",
-                image="https://images.unsplash.com/photo-1541519227354-08fa5d50c44d?w=400",
-                restaurant=RestaurantInfo(
-                    id="rest-7",
-                    name="Morning Glory Cafe",
-                    cuisine="Breakfast",
-                    distance="0.2 mi",
-                    rating=4.3,
-                    price_range="$",
-                    address="789 Brunch St, NYC",
-                    lat=40.7614,
-                    lng=-73.9776,
-                    phone="(555) 789-0123"
-                ),
-                price=8.99,
-                calories=320,
-                protein=12.0,
-                carbs=28.0,
-                fat=18.0,
-                fiber=8.0,
-                sugar=6.0,
-                sodium=420.0,
-                dietary=["Vegetarian", "Healthy"],
-                ingredients=["sourdough bread", "avocado", "cherry tomatoes", "hemp seeds", "balsamic"],
-                allergens=["gluten"],
-                highlights=["Healthy fats", "Fresh ingredients", "Instagram worthy"],
-                category="breakfast",
-                preparation_time="8 min",
-                is_popular=False,
-                cuisine_tags=["healthy", "brunch", "instagram"],
-                spice_level="mild",
-                meal_time=["breakfast", "brunch"]
-            ),
-            
-            MenuItem(
-                id="item-8",
-                name="Wagyu Beef Burger",
-                description="Premium wagyu beef patty with aged cheddar, caramelized onions, and truffle aioli",
-                image="https://images.unsplash.com/photo-1568901346375-23c9450c58cd?w=400",
-                restaurant=RestaurantInfo(
-                    id="rest-8",
-                    name="Burger Palace",
-                    cuisine="American",
-                    distance="0.9 mi",
-                    rating=4.6,
-                    price_range="$$",
-                    address="456 Meat Ave, NYC",
-                    lat=40.7505,
-                    lng=-73.9934,
-                    phone="(555) 890-1234"
-                ),
-                price=18.99,
-                calories=780,
-                protein=45.0,
-                carbs=52.0,
-                fat=42.0,
-                fiber=3.0,
-                sugar=8.0,
-                sodium=1200.0,
-                dietary=["High Protein"],
-                ingredients=["wagyu beef", "aged cheddar", "caramelized onions", "truffle aioli", "brioche bun"],
-                allergens=["gluten", "dairy", "egg"],
-                highlights=["Premium wagyu", "Gourmet toppings", "Juicy patty"],
-                category="sandwiches",
-                preparation_time="15 min",
-                is_popular=True,
-                cuisine_tags=["american", "gourmet", "comfort"],
-                spice_level="mild",
-                meal_time=["lunch", "dinner"]
-            ),
-            
-            MenuItem(
-                id="item-9",
-                name="Chocolate Lava Cake",
-                description="Warm chocolate cake with molten center, vanilla ice cream, and berry compote",
-                image="https://images.unsplash.com/photo-1606313564200-e75d5e30476c?w=400",
-                restaurant=RestaurantInfo(
-                    id="rest-9",
-                    name="Sweet Dreams Desserts",
-                    cuisine="Desserts",
-                    distance="0.4 mi",
-                    rating=4.7,
-                    price_range="$$",
-                    address="123 Sugar St, NYC",
-                    lat=40.7614,
-                    lng=-73.9776,
-                    phone="(555) 901-2345"
-                ),
-                price=12.99,
-                calories=480,
-                protein=8.0,
-                carbs=65.0,
-                fat=22.0,
-                fiber=4.0,
-                sugar=52.0,
-                sodium=180.0,
-                dietary=["Vegetarian"],
-                ingredients=["dark chocolate", "butter", "eggs", "flour", "vanilla ice cream", "berries"],
-                allergens=["gluten", "dairy", "egg"],
-                highlights=["Molten center", "Rich chocolate", "Perfect temperature"],
-                category="desserts",
-                preparation_time="12 min",
-                is_popular=True,
-                cuisine_tags=["dessert", "chocolate", "indulgent"],
-                spice_level="mild",
-                meal_time=["dessert"]
-            ),
-            
-            MenuItem(
-                id="item-10",
-                name="Green Goddess Smoothie",
-                description="Spinach, kale, mango, banana, and coconut water blend with chia seeds",
-                image="https://images.unsplash.com/photo-1553530666-ba11a7da3888?w=400",
-                restaurant=RestaurantInfo(
-                    id="rest-10",
-                    name="Vitality Juice Bar",
-                    cuisine="Healthy",
-                    distance="0.3 mi",
-                    rating=4.2,
-                    price_range="$",
-                    address="567 Wellness Way, NYC",
-                    lat=40.7505,
-                    lng=-73.9934,
-                    phone="(555) 012-3456"
-                ),
-                price=7.99,
-                calories=180,
-                protein=6.0,
-                carbs=38.0,
-                fat=2.0,
-                fiber=8.0,
-                sugar=28.0,
-                sodium=85.0,
-                dietary=["Vegan", "Gluten Free", "Organic"],
-                ingredients=["spinach", "kale", "mango", "banana", "coconut water", "chia seeds"],
-                allergens=[],
-                highlights=["Superfood blend", "Natural energy", "Vitamin packed"],
-                category="beverages",
-                preparation_time="3 min",
-                is_popular=False,
-                cuisine_tags=["healthy", "vegan", "smoothie"],
-                spice_level="mild",
-                meal_time=["breakfast", "snack", "pre-workout"]
-            )
-        ]
-    
+        """Return the shared mock menu items as a fresh list"""
+        return list(_MOCK_MENU_ITEMS)
+
     # Supabase integration methods
     async def _search_supabase_menu_items(self, request: MenuItemSearchRequest) -> List[MenuItem]:
         """Search menu items in Supabase database"""
-        from ..core.supabase import get_supabase_client
-        
         client = get_supabase_client()
         
         try:
-            # Build the query
-            query = client.table('menu_items').select('''
-                id, name, description, price, image_url,
-                estimated_calories, estimated_protein_g, estimated_carbs_g, estimated_fat_g,
-                estimated_fiber_g, estimated_sugar_g, estimated_sodium_mg,
-                inferred_dietary_tags, inferred_cuisine_type, inferred_health_tags,
-                inferred_spice_level, inferred_meal_category, inferred_cooking_methods,
-                inferred_allergens, tag_confidence, nutrition_confidence,
-                restaurant_id,
-                restaurants(id, name, cuisine, price_level, rating, address, phone, location)
-            ''')
-            
-            # Apply semantic search and tagging
-            if request.query and request.query.strip():
-                original_query = request.query.strip()
-                translated_query = request.personalization.get('translated_query', '') if request.personalization else ''
-                
-                # Use semantic search with original query (for embeddings if available)
-                # For now, use intelligent keyword matching with original query
-                search_terms = original_query.lower()
-                
-                # If we have specific filters (like min_protein), prioritize those over text search
-                has_specific_filters = any([
-                    request.filters.get('min_protein'),
-                    request.filters.get('max_calories'),
-                    request.filters.get('dietary_restrictions'),
-                    request.filters.get('max_price')
-                ])
-                
-                if has_specific_filters and any(term in search_terms for term in ['high protein', 'protein', 'low calorie', 'healthy']):
-                    # For generic health terms with specific filters, don't apply text search
-                    # Let the filters do the work
-                    pass
-                elif 'pizza' in search_terms:
-                    # Pizza-specific search using name first, then meal category
-                    query = query.or_('name.ilike.%pizza%,inferred_meal_category.ilike.%pizza%')
-                elif 'burger' in search_terms:
-                    # Burger-specific search
-                    query = query.or_('name.ilike.%burger%,inferred_meal_category.ilike.%burger%')
-                elif 'sushi' in search_terms:
-                    # Sushi-specific search
-                    query = query.or_('name.ilike.%sushi%,inferred_cuisine_type.ilike.%japanese%')
-                elif 'chicken' in search_terms:
-                    # Chicken search using name and description
-                    query = query.or_('name.ilike.%chicken%,description.ilike.%chicken%')
-                elif 'salad' in search_terms:
-                    # Salad search using name and meal category
-                    query = query.or_('name.ilike.%salad%,inferred_meal_category.ilike.%salad%')
-                elif 'healthy' in search_terms:
-                    # Healthy options using health tags
-                    query = query.or_('inferred_health_tags.cs.{"healthy","low-calorie","high-protein"}')
-                elif 'vegetarian' in search_terms or 'vegan' in search_terms:
-                    # Vegetarian/vegan search using dietary tags
-                    query = query.or_('inferred_dietary_tags.cs.{"vegetarian","vegan"}')
-                else:
-                    # General semantic search using name and description with original query
-                    query = query.or_(f'name.ilike.%{search_terms}%,description.ilike.%{search_terms}%')
-            
-            # Apply filters
-            if request.filters:
-                if max_calories := request.filters.get('max_calories'):
-                    query = query.lte('estimated_calories', max_calories)
-                if min_protein := request.filters.get('min_protein'):
-                    query = query.gte('estimated_protein_g', min_protein)
-                if max_price := request.filters.get('max_price'):
-                    query = query.lte('price', max_price)
-                if dietary_restrictions := request.filters.get('dietary_restrictions'):
-                    # Use overlap operator for array fields
-                    query = query.overlaps('inferred_dietary_tags', dietary_restrictions)
-                if categories := request.filters.get('categories'):
-                    query = query.in_('inferred_meal_category', categories)
-                if allergen_free := request.filters.get('allergen_free'):
-                    # Exclude items with these allergens
-                    for allergen in allergen_free:
-                        query = query.not_.contains('inferred_allergens', [allergen])
-            
-            # Prioritize items with nutrition data (when not using mock data)
-            if not self.use_mock_data:
-                # Filter to items that have meaningful nutrition data (not null and not zero)
-                query = query.not_.is_('estimated_calories', 'null').gt('estimated_calories', 0)
-            
-            # Apply sorting
-            if request.sort_by == "price":
-                query = query.order('price', desc=(request.sort_order == "desc"))
-            elif request.sort_by == "calories":
-                query = query.order('estimated_calories', desc=(request.sort_order == "desc"))
-            elif request.sort_by == "protein":
-                query = query.order('estimated_protein_g', desc=(request.sort_order == "desc"))
-            elif request.sort_by == "rating":
-                query = query.order('restaurants.rating', desc=(request.sort_order == "desc"))
-            else:  # relevance - prioritize items with nutrition data
-                # Order by nutrition confidence (items with data will have higher confidence)
-                query = query.order('nutrition_confidence', desc=True)
-                # Then by calories for items with data
-                query = query.order('estimated_calories', desc=True)
-            
-            # Apply pagination
-            query = query.range(request.offset, request.offset + request.limit - 1)
-            
-            # Execute query
-            response = query.execute()
-            
-            # Deduplicate items by name and restaurant before conversion
-            seen_items = set()
-            unique_items_data = []
-            
-            for item_data in response.data:
-                # Create a unique key based on name and restaurant
-                restaurant_name = item_data.get('restaurants', {}).get('name', '') if item_data.get('restaurants') else ''
-                unique_key = f"{item_data.get('name', '')}|{restaurant_name}"
-                
-                if unique_key not in seen_items:
-                    seen_items.add(unique_key)
-                    unique_items_data.append(item_data)
-            
-            print(f"Deduplication: {len(response.data)} items -> {len(unique_items_data)} unique items")
+            rows = None
+            if type(self)._search_rpc_available:
+                rows = await self._search_rows_via_rpc(request)
+            if rows is None:
+                rows = self._search_rows_via_query(client, request)
+
+            # Deduplicate items by (name, restaurant) before conversion;
+            # tuple keys skip the per-row f-string build, setdefault keeps
+            # the first occurrence and insertion order like the old scan
+            deduped: Dict[tuple, dict] = {}
+            for item_data in rows:
+                deduped.setdefault(
+                    (item_data.get('name', ''), (item_data.get('restaurants') or {}).get('name', '')),
+                    item_data
+                )
+            unique_items_data = list(deduped.values())
+
+            logger.debug("Deduplication: %d items -> %d unique items", len(rows), len(unique_items_data))
             
-            # Convert to MenuItem objects
+            # For large pages, cut the rows down with vectorized numeric
+            # filters and scoring before paying Pydantic construction
+            unique_items_data = self._prefilter_rows_numpy(unique_items_data, request)
+
+            # Decode all restaurant coordinates in one vectorized pass
+            # instead of one struct.unpack per row
+            hex_list = [
+                (item_data.get('restaurants') or {}).get('location')
+                for item_data in unique_items_data
+            ]
+            coords = await self._extract_coordinates_async(hex_list)
+
+            # Convert to MenuItem objects; items sharing a restaurant reuse
+            # one RestaurantInfo for the duration of this request
+            restaurant_cache: Dict[str, RestaurantInfo] = {}
             menu_items = []
-            for item_data in unique_items_data:
-                menu_item = self._convert_supabase_to_menu_item(item_data)
+            for item_data, (lng, lat) in zip(unique_items_data, coords):
+                location = None if np.isnan(lat) else {"lat": float(lat), "lng": float(lng)}
+                menu_item = self._convert_supabase_to_menu_item(item_data, coordinates=location,
+                                                               restaurant_cache=restaurant_cache)
                 if menu_item:
                     menu_items.append(menu_item)
             
             return menu_items
             
-        except Exception as e:
-            print(f"❌ Supabase search error: {e}")
+        except Exception:
+            logger.exception("Supabase search failed")
             # Fallback to mock data if Supabase fails
             return await self._get_mock_menu_items(request)
     
-    def _convert_supabase_to_menu_item(self, item_data: dict) -> Optional[MenuItem]:
-        """Convert Supabase menu item data to MenuItem model"""
+    def _prefilter_rows_numpy(self, rows: List[dict], request: MenuItemSearchRequest) -> List[dict]:
+        """Vectorized numeric prefilter and top-K cut over raw Supabase rows
+
+        For large result sets the numeric filters and the ranking score run
+        as array ops over parallel columns (SoA layout) so MenuItem models
+        are only constructed for rows that can actually be returned. The
+        query already paginates server-side, so this engages only when a
+        caller requests an unusually large page. Twice the page size is
+        kept so the Python-side tag filters still have slack to drop rows.
+        """
+        n = len(rows)
+        keep = (request.offset + request.limit) * 2
+        if n < self._VECTORIZE_MIN_ROWS or n <= keep:
+            return rows
+
+        calories = np.fromiter(
+            ((row.get('estimated_calories') or 0) for row in rows), dtype=np.float32, count=n)
+        protein = np.fromiter(
+            ((row.get('estimated_protein_g') or 0) for row in rows), dtype=np.float32, count=n)
+        price = np.fromiter(
+            ((row.get('price') or 0) for row in rows), dtype=np.float32, count=n)
+        rating = np.fromiter(
+            (((row.get('restaurants') or {}).get('rating') or 4.0) for row in rows),
+            dtype=np.float32, count=n)
+
+        mask = np.ones(n, dtype=bool)
+        filters = request.filters or {}
+        if max_calories := filters.get('max_calories'):
+            mask &= calories <= max_calories
+        if min_protein := filters.get('min_protein'):
+            mask &= protein >= min_protein
+        if max_price := filters.get('max_price'):
+            mask &= price <= max_price
+
+        # Same shape as the mock scoring: normalized rating plus a
+        # post-workout protein boost
+        score = rating / 5.0
+        personalization = request.personalization or {}
+        if personalization.get('context') == 'post_workout':
+            score = score + 0.3 * (protein >= 25)
+
+        candidates = np.flatnonzero(mask)
+        if len(candidates) > keep:
+            # argpartition is O(n) against a full sort's O(n log n); the
+            # survivors get properly ordered downstream in _apply_sorting
+            order = np.argpartition(-score[candidates], keep - 1)[:keep]
+            candidates = candidates[order]
+        return [rows[i] for i in candidates]
+
+    def _convert_supabase_to_menu_item(self, item_data: dict,
+                                       coordinates: Optional[Dict[str, float]] = None,
+                                       restaurant_cache: Optional[Dict[str, RestaurantInfo]] = None) -> Optional[MenuItem]:
+        """Convert Supabase menu item data to MenuItem model
+
+        Batched callers pass pre-decoded coordinates; single-item callers
+        leave them None and the PostGIS field is decoded here. A per-request
+        restaurant_cache lets items from the same restaurant share one
+        validated RestaurantInfo instead of rebuilding it per row.
+        """
         try:
             # Extract restaurant data
             restaurant_data = item_data.get('restaurants', {})
+            restaurant_id = restaurant_data.get('id', '')
+
+            restaurant_info = restaurant_cache.get(restaurant_id) if restaurant_cache is not None else None
+            if restaurant_info is None:
+                # Map price level to price range
+                price_level = restaurant_data.get('price_level', 2)
+                price_range = _PRICE_RANGE[price_level] if isinstance(price_level, int) and 1 <= price_level <= 4 else '$$'
+
+                # Extract coordinates from PostGIS location field
+                location_data = coordinates if coordinates is not None else \
+                    self._extract_coordinates_from_postgis(restaurant_data.get('location'))
+                lat = location_data.get('lat') if location_data else None
+                lng = location_data.get('lng') if location_data else None
+
+                # Row data comes from our own schema; model_construct
+                # skips redundant validation (model_post_init still runs)
+                restaurant_info = RestaurantInfo.model_construct(
+                    id=restaurant_id,
+                    name=restaurant_data.get('name', 'Unknown Restaurant'),
+                    cuisine=restaurant_data.get('cuisine', 'Unknown'),
+                    distance="0.5 mi",  # TODO: Calculate actual distance
+                    rating=float(restaurant_data.get('rating', 4.0)) if restaurant_data.get('rating') is not None else 4.0,
+                    price_range=price_range,
+                    address=restaurant_data.get('address'),
+                    phone=restaurant_data.get('phone'),
+                    lat=lat,
+                    lng=lng
+                )
+                if restaurant_cache is not None:
+                    restaurant_cache[restaurant_id] = restaurant_info
             
-            # Map price level to price range
-            price_level = restaurant_data.get('price_level', 2)
-            price_range_map = {1: '$', 2: '$$', 3: '$$$', 4: '$$$$'}
-            price_range = price_range_map.get(price_level, '$$')
-            
-            # Extract coordinates from PostGIS location field
-            location_data = self._extract_coordinates_from_postgis(restaurant_data.get('location'))
-            lat = location_data.get('lat') if location_data else None
-            lng = location_data.get('lng') if location_data else None
-            
-            # Create restaurant info
-            restaurant_info = RestaurantInfo(
-                id=restaurant_data.get('id', ''),
-                name=restaurant_data.get('name', 'Unknown Restaurant'),
-                cuisine=restaurant_data.get('cuisine', 'Unknown'),
-                distance="0.5 mi",  # TODO: Calculate actual distance
-                rating=float(restaurant_data.get('rating', 4.0)) if restaurant_data.get('rating') is not None else 4.0,
-                price_range=price_range,
-                address=restaurant_data.get('address'),
-                phone=restaurant_data.get('phone'),
-                lat=lat,
-                lng=lng
-            )
-            
+            # One .get() and cast per nutrition field via the module table
+            nutrition = {
+                field: (float(value) if (value := item_data.get(key)) is not None else default)
+                for field, key, default in _NUTRITION_FIELDS
+            }
+            calories = item_data.get('estimated_calories')
+
             # Create menu item
-            menu_item = MenuItem(
+            menu_item = MenuItem.model_construct(
                 id=item_data.get('id', ''),
                 name=item_data.get('name', ''),
                 description=item_data.get('description') or '',
-                image=item_data.get('image_url') or 'https://images.unsplash.com/photo-1512621776951-a57141f2eefd?w=400',
+                image=item_data.get('image_url') or _DEFAULT_ITEM_IMAGE,
                 restaurant=restaurant_info,
-                price=float(item_data.get('price', 0)) if item_data.get('price') is not None else 0.0,
-                calories=int(item_data.get('estimated_calories', 0)) if item_data.get('estimated_calories') is not None else 0,
-                protein=float(item_data.get('estimated_protein_g', 0)) if item_data.get('estimated_protein_g') is not None else 0,
-                carbs=float(item_data.get('estimated_carbs_g', 0)) if item_data.get('estimated_carbs_g') is not None else 0,
-                fat=float(item_data.get('estimated_fat_g', 0)) if item_data.get('estimated_fat_g') is not None else 0,
-                fiber=float(item_data.get('estimated_fiber_g')) if item_data.get('estimated_fiber_g') is not None else None,
-                sugar=float(item_data.get('estimated_sugar_g')) if item_data.get('estimated_sugar_g') is not None else None,
-                sodium=float(item_data.get('estimated_sodium_mg')) if item_data.get('estimated_sodium_mg') is not None else None,
+                calories=int(calories) if calories is not None else 0,
+                **nutrition,
                 dietary=item_data.get('inferred_dietary_tags') or [],
                 ingredients=[],  # TODO: Add ingredients if available
                 allergens=item_data.get('inferred_allergens') or [],
@@ -794,16 +1191,36 @@ class MenuItemService:
             
             return menu_item
             
-        except Exception as e:
-            print(f"❌ Error converting menu item: {e}")
+        except Exception:
+            logger.exception("Error converting menu item")
             return None
 
+    # Same optimistic probe pattern as the search RPC
+    _item_rpc_available = True
+
     async def _get_supabase_menu_item(self, menu_item_id: str) -> Optional[MenuItem]:
         """Get menu item from Supabase by ID"""
-        from ..core.supabase import get_supabase_client
-        
         client = get_supabase_client()
-        
+
+        # Preferred path: one jsonb payload with the restaurant joined
+        # server-side (see search_menu_items_function.sql)
+        if type(self)._item_rpc_available:
+            try:
+                response = client.rpc('get_menu_item_with_restaurant',
+                                      {'p_id': menu_item_id}).execute()
+                if not response.data:
+                    return None
+                item_data = response.data['item'] if isinstance(response.data, dict) \
+                    else response.data[0]['item']
+                restaurant = (response.data.get('restaurant') if isinstance(response.data, dict)
+                              else response.data[0].get('restaurant')) or {}
+                item_data['restaurants'] = restaurant
+                return self._convert_supabase_to_menu_item(item_data)
+            except Exception as e:
+                type(self)._item_rpc_available = False
+                logger.warning("get_menu_item_with_restaurant RPC unavailable, "
+                               "falling back to two queries: %s", e)
+
         try:
             response = client.table('menu_items').select('''
                 id, name, description, price, image_url,
@@ -812,51 +1229,57 @@ class MenuItemService:
                 inferred_dietary_tags, inferred_cuisine_type, inferred_health_tags,
                 inferred_spice_level, inferred_meal_category, inferred_cooking_methods,
                 inferred_allergens, tag_confidence, nutrition_confidence,
-                restaurant_id,
-                restaurants(id, name, cuisine, price_level, rating, address, phone, location)
+                restaurant_id
             ''').eq('id', menu_item_id).execute()
+
+            if not response.data:
+                return None
+
+            # Fetch the restaurant flat instead of through the LATERAL
+            # join the embed would generate
+            item_data = response.data[0]
+            if restaurant_id := item_data.get('restaurant_id'):
+                restaurant_response = client.table('restaurants').select(
+                    _RESTAURANT_COLUMNS
+                ).eq('id', restaurant_id).execute()
+                item_data['restaurants'] = restaurant_response.data[0] if restaurant_response.data else {}
+            return self._convert_supabase_to_menu_item(item_data)
             
-            if response.data:
-                return self._convert_supabase_to_menu_item(response.data[0])
-            return None
-            
-        except Exception as e:
-            print(f"❌ Error getting menu item: {e}")
+        except Exception:
+            logger.exception("Error getting menu item")
             return None
     
     async def _record_supabase_interaction(self, interaction: MenuItemInteraction) -> bool:
         """Record interaction in Supabase"""
-        from ..core.supabase import get_supabase_client
-        
         client = get_supabase_client()
         
         try:
             # For now, just log the interaction
             # TODO: Create user_interactions table in Supabase
-            print(f"📊 Recording interaction: {interaction.action} for menu item {interaction.menu_item_id} by user {interaction.user_id}")
+            logger.info("Recording interaction: %s for menu item %s by user %s",
+                        interaction.action, interaction.menu_item_id, interaction.user_id)
             return True
             
-        except Exception as e:
-            print(f"❌ Error recording interaction: {e}")
+        except Exception:
+            logger.exception("Error recording interaction")
             return False
     
     async def _get_supabase_liked_items(self, user_id: str) -> List[MenuItem]:
         """Get liked items from Supabase"""
-        from ..core.supabase import get_supabase_client
-        
-        client = get_supabase_client()
-        
         try:
-            # For now, return a subset of menu items as "liked"
+            # For now, return a subset of menu items as "liked"; bound the
+            # search to the three rows we keep instead of fetching a full
+            # default page and slicing
             # TODO: Create user_likes table in Supabase
             request = MenuItemSearchRequest(
-                location={"lat": 40.7580, "lng": -73.9855}
+                location={"lat": 40.7580, "lng": -73.9855},
+                limit=3,
+                offset=0
             )
-            all_items = await self._search_supabase_menu_items(request)
-            return all_items[:3]  # Return first 3 as liked items
+            return await self._search_supabase_menu_items(request)
             
-        except Exception as e:
-            print(f"❌ Error getting liked items: {e}")
+        except Exception:
+            logger.exception("Error getting liked items")
             return []
 
 
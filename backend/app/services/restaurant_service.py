@@ -4,8 +4,10 @@ Restaurant service with real Supabase and mock implementations
 
 import uuid
 import math
-import random
+import zlib
 from typing import List, Optional, Dict, Any, Tuple
+
+import numpy as np
 from app.core.config import settings
 from app.core.supabase import get_supabase_client
 from app.models.restaurant import Restaurant, FrontendRestaurant, MenuItem
@@ -14,9 +16,43 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Price level 1-4 indexes straight into the tuple; anything else maps to '$$'
+_PRICE_RANGE = ('', '$', '$$', '$$$', '$$$$')
+
+_MOCK_CUISINES = ('Italian', 'Asian', 'American', 'Mexican')
+
+# Columns the frontend transform and Restaurant list responses actually
+# consume; select('*') also shipped description/open_hours/delivery blobs
+_RESTAURANT_COLUMNS = 'id,name,cuisine,price_level,rating,address,phone,image_url,latitude,longitude'
+
+
+def _haversine_miles_batch(lat: float, lng: float, rows: List[Dict[str, Any]]) -> np.ndarray:
+    """Distances in miles from (lat, lng) to each row, vectorized.
+
+    One pass of np.radians/sin/cos/arctan2 over contiguous arrays instead of
+    per-row math.* calls; rows without coordinates come back as NaN.
+    """
+    lats = np.fromiter(
+        (r.get('latitude') or np.nan for r in rows), dtype=np.float64, count=len(rows)
+    )
+    lngs = np.fromiter(
+        (r.get('longitude') or np.nan for r in rows), dtype=np.float64, count=len(rows)
+    )
+
+    dlat = np.radians(lats - lat)
+    dlng = np.radians(lngs - lng)
+    a = (np.sin(dlat / 2) ** 2 +
+         np.cos(math.radians(lat)) * np.cos(np.radians(lats)) * np.sin(dlng / 2) ** 2)
+    return 3959 * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
 class RestaurantService:
     """Service for restaurant operations"""
-    
+
+    # Flips False the first time the search_restaurants_nearby RPC
+    # (search_restaurants_nearby.sql) is missing, so we only probe once
+    _nearby_rpc_available = True
+
     def __init__(self):
         self.use_mock = settings.MOCK_DATA
         if self.use_mock:
@@ -164,26 +200,70 @@ class RestaurantService:
     async def _mock_nearby_restaurants(
         self, lat: float, lng: float, radius_miles: float, limit: int
     ) -> List[Restaurant]:
-        """Mock nearby restaurants"""
-        restaurants = []
-        for i in range(min(limit, 10)):
-            # Generate random nearby coordinates
-            lat_offset = random.uniform(-0.01, 0.01)
-            lng_offset = random.uniform(-0.01, 0.01)
-            
-            restaurants.append(Restaurant(
+        """Mock nearby restaurants
+
+        One seeded default_rng batch generates every attribute up front —
+        deterministic between calls and no per-restaurant draws against the
+        lock-holding random module.
+        """
+        n = min(limit, 10)
+        rng = np.random.default_rng(0)
+        lat_offsets = rng.uniform(-0.01, 0.01, size=n)
+        lng_offsets = rng.uniform(-0.01, 0.01, size=n)
+        cuisine_idx = rng.integers(0, len(_MOCK_CUISINES), size=n)
+        ratings = np.round(rng.uniform(3.5, 5.0, size=n), 1)
+        price_levels = rng.integers(1, 5, size=n)
+
+        return [
+            Restaurant(
                 id=uuid.uuid4(),
                 name=f"Mock Restaurant {i+1}",
-                cuisine=random.choice(["Italian", "Asian", "American", "Mexican"]),
-                latitude=lat + lat_offset,
-                longitude=lng + lng_offset,
-                rating=round(random.uniform(3.5, 5.0), 1),
-                price_level=random.randint(1, 4)
-            ))
-        
-        return restaurants
+                cuisine=_MOCK_CUISINES[cuisine_idx[i]],
+                latitude=lat + lat_offsets[i],
+                longitude=lng + lng_offsets[i],
+                rating=float(ratings[i]),
+                price_level=int(price_levels[i])
+            )
+            for i in range(n)
+        ]
     
     # Real Supabase implementations
+    def _nearby_rows_via_rpc(
+        self,
+        supabase,
+        lat: float,
+        lng: float,
+        radius_meters: float,
+        limit: int,
+        max_price: Optional[int] = None,
+        cuisines: Optional[List[str]] = None
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Fetch nearby rows via the search_restaurants_nearby RPC.
+
+        Postgres computes distance_miles with ST_Distance next to the
+        ST_DWithin filter, so no Python trig runs per row. Returns None when
+        the function is not installed and remembers that for later calls.
+        """
+        if not RestaurantService._nearby_rpc_available:
+            return None
+        try:
+            response = supabase.rpc('search_restaurants_nearby', {
+                'p_lat': lat,
+                'p_lng': lng,
+                'p_radius_meters': radius_meters,
+                'p_max_price': max_price,
+                'p_cuisines': cuisines,
+                'p_limit': limit
+            }).execute()
+            return response.data or []
+        except Exception as e:
+            RestaurantService._nearby_rpc_available = False
+            logger.warning(
+                "search_restaurants_nearby RPC unavailable, falling back to "
+                "table query with client-side distance: %s", e
+            )
+            return None
+
     async def _real_search_restaurants(
         self, 
         request: RestaurantSearchRequest,
@@ -193,41 +273,64 @@ class RestaurantService:
         
         try:
             supabase = get_supabase_client()
-            
-            # Build query
-            query = supabase.table('restaurants').select('*')
-            
-            # Apply location filter if provided
+            filters = request.filters or {}
+
+            # Prefer the RPC: distance arrives precomputed by PostGIS
+            restaurants = None
             if request.location:
-                # Use PostGIS for location queries
-                lat, lng = request.location['lat'], request.location['lng']
-                radius_meters = 3218.7  # 2 miles in meters (default)
-                
-                query = query.filter(
-                    'location',
-                    'dwithin',
-                    f'POINT({lng} {lat})',
-                    radius_meters
+                restaurants = self._nearby_rows_via_rpc(
+                    supabase,
+                    request.location['lat'],
+                    request.location['lng'],
+                    radius_meters=3218.7,  # 2 miles (default)
+                    limit=request.limit or 20,
+                    max_price=filters.get('max_price'),
+                    cuisines=filters.get('cuisine_types')
                 )
-            
-            # Apply other filters
-            if request.filters:
-                if request.filters.get('max_price'):
-                    query = query.lte('price_level', request.filters['max_price'])
-                
-                if request.filters.get('cuisine_types'):
-                    query = query.in_('cuisine', request.filters['cuisine_types'])
-            
-            # Execute query
-            response = query.limit(request.limit or 20).execute()
-            restaurants = response.data
-            
-            # Transform to frontend format
+
+            if restaurants is None:
+                # Build query
+                query = supabase.table('restaurants').select(_RESTAURANT_COLUMNS)
+
+                # Apply location filter if provided
+                if request.location:
+                    # Use PostGIS for location queries
+                    lat, lng = request.location['lat'], request.location['lng']
+                    radius_meters = 3218.7  # 2 miles in meters (default)
+
+                    query = query.filter(
+                        'location',
+                        'dwithin',
+                        f'POINT({lng} {lat})',
+                        radius_meters
+                    )
+
+                # Apply other filters
+                if filters.get('max_price'):
+                    query = query.lte('price_level', filters['max_price'])
+
+                if filters.get('cuisine_types'):
+                    query = query.in_('cuisine', filters['cuisine_types'])
+
+                # Execute query
+                response = query.limit(request.limit or 20).execute()
+                restaurants = response.data
+
+            # Distances: already on the rows from the RPC, otherwise one
+            # vectorized pass over the page
+            distances = None
+            if request.location and restaurants and 'distance_miles' not in restaurants[0]:
+                distances = _haversine_miles_batch(
+                    request.location['lat'], request.location['lng'], restaurants
+                )
+
             frontend_restaurants = []
-            for restaurant in restaurants:
+            for i, restaurant in enumerate(restaurants):
                 frontend_restaurant = await self._transform_to_frontend(
-                    restaurant, 
-                    request.location
+                    restaurant,
+                    request.location,
+                    distance_miles=(restaurant.get('distance_miles')
+                                    if distances is None else distances[i])
                 )
                 frontend_restaurants.append(frontend_restaurant)
             
@@ -267,15 +370,21 @@ class RestaurantService:
         try:
             supabase = get_supabase_client()
             radius_meters = radius_miles * 1609.34  # Convert miles to meters
-            
-            response = supabase.table('restaurants').select('*').filter(
-                'location',
-                'dwithin',
-                f'POINT({lng} {lat})',
-                radius_meters
-            ).limit(limit).execute()
-            
-            return [Restaurant(**r) for r in response.data]
+
+            rows = self._nearby_rows_via_rpc(supabase, lat, lng, radius_meters, limit)
+            if rows is None:
+                response = supabase.table('restaurants').select(_RESTAURANT_COLUMNS).filter(
+                    'location',
+                    'dwithin',
+                    f'POINT({lng} {lat})',
+                    radius_meters
+                ).limit(limit).execute()
+                rows = response.data
+            else:
+                for r in rows:
+                    r.pop('distance_miles', None)  # Restaurant model has no such field
+
+            return [Restaurant(**r) for r in rows]
             
         except Exception as e:
             logger.error(f"Nearby restaurants query failed: {e}")
@@ -316,26 +425,37 @@ class RestaurantService:
     
     async def _transform_to_frontend(
         self, 
-        restaurant: Dict[str, Any], 
-        user_location: Optional[Dict[str, float]] = None
+        restaurant: Dict[str, Any],
+        user_location: Optional[Dict[str, float]] = None,
+        distance_miles: Optional[float] = None
     ) -> FrontendRestaurant:
-        """Transform database restaurant to frontend format"""
-        
+        """Transform database restaurant to frontend format
+
+        Pass distance_miles when it was already computed in a batch
+        (see _haversine_miles_batch); otherwise it is derived per row.
+        """
+
         # Calculate distance if user location provided
         distance_str = "Unknown"
-        if user_location and restaurant.get('latitude') and restaurant.get('longitude'):
+        if distance_miles is None and user_location and restaurant.get('latitude') and restaurant.get('longitude'):
             distance_miles = self._calculate_distance(
                 user_location['lat'], user_location['lng'],
                 restaurant['latitude'], restaurant['longitude']
             )
+        if distance_miles is not None and not math.isnan(distance_miles):
             distance_str = f"{distance_miles:.1f} mi" if distance_miles >= 0.1 else f"{int(distance_miles * 5280)} ft"
         
         # Convert price level to string
-        price_map = {1: '$', 2: '$$', 3: '$$$', 4: '$$$$'}
-        price_str = price_map.get(restaurant.get('price_level', 2), '$$')
+        price_level = restaurant.get('price_level', 2)
+        price_str = _PRICE_RANGE[price_level] if isinstance(price_level, int) and 1 <= price_level <= 4 else '$$'
         
-        # Generate estimated wait time (simple algorithm)
-        wait_time = f"{15 + hash(restaurant['id']) % 20} min"
+        # Estimated wait time: read the generated column when present
+        # (see add_estimated_wait_minutes.sql); adler32 fallback for rows
+        # fetched without it, stable unlike SipHash-randomized hash(str)
+        wait_minutes = restaurant.get('estimated_wait_minutes')
+        if wait_minutes is None:
+            wait_minutes = 15 + zlib.adler32(str(restaurant['id']).encode()) % 20
+        wait_time = f"{wait_minutes} min"
         
         return FrontendRestaurant(
             id=str(restaurant['id']),
@@ -16,6 +16,20 @@ def check_python_version():
         sys.exit(1)
     print(f"✅ Python {sys.version.split()[0]}")
 
+def _load_env(path: Path):
+    """Read KEY=VALUE lines from a .env file into os.environ
+
+    A .env here is a handful of flat keys; parsing it directly skips
+    importing dotenv and its machinery on every startup. Existing
+    environment variables win, matching load_dotenv's default.
+    """
+    for line in path.read_text().splitlines():
+        line = line.strip()
+        if not line or line.startswith('#') or '=' not in line:
+            continue
+        key, value = line.split('=', 1)
+        os.environ.setdefault(key.strip(), value.strip().strip('"').strip("'"))
+
 def check_environment():
     """Check environment variables"""
     env_file = Path(".env")
@@ -26,10 +40,9 @@ def check_environment():
             print("   cp env.example .env")
             print("   # Edit .env with your API keys")
         return False
-    
+
     # Load .env
-    from dotenv import load_dotenv
-    load_dotenv()
+    _load_env(env_file)
     
     required_vars = ["SUPABASE_URL", "GROQ_API_KEY"]
     missing_vars = []
@@ -58,18 +71,20 @@ def install_dependencies():
         return False
 
 def test_imports():
-    """Test if all imports work"""
-    try:
-        import fastapi
-        import uvicorn
-        import supabase
-        import groq
-        print("✅ All imports successful")
-        return True
-    except ImportError as e:
-        print(f"❌ Import error: {e}")
+    """Test if all required packages are installed
+
+    find_spec resolves each package without executing its module code,
+    so the startup check skips the heavy transitive imports; the only
+    full import happens inside uvicorn.run.
+    """
+    from importlib.util import find_spec
+    missing = [m for m in ("fastapi", "uvicorn", "supabase", "groq") if find_spec(m) is None]
+    if missing:
+        print(f"❌ Missing packages: {', '.join(missing)}")
         print("💡 Try running: pip install -r requirements.txt")
         return False
+    print("✅ All imports successful")
+    return True
 
 def start_server(host="0.0.0.0", port=8000, reload=True):
     """Start the FastAPI server"""
@@ -5,23 +5,30 @@ Test all endpoints to ensure they work correctly
 """
 
 import asyncio
-import json
 import httpx
+import orjson
 from typing import Dict, Any
 
 BASE_URL = "http://localhost:8000"
 
+_JSON_HEADERS = {"content-type": "application/json"}
+
 async def test_endpoint(client: httpx.AsyncClient, method: str, url: str, data: Dict[Any, Any] = None):
-    """Test a single endpoint"""
+    """Test a single endpoint
+
+    Bodies are encoded and decoded with orjson rather than the stdlib
+    json codec httpx uses by default.
+    """
     try:
+        body = orjson.dumps(data) if data is not None else None
         if method == "GET":
             response = await client.get(url)
         elif method == "POST":
-            response = await client.post(url, json=data)
+            response = await client.post(url, content=body, headers=_JSON_HEADERS)
         elif method == "PUT":
-            response = await client.put(url, json=data)
+            response = await client.put(url, content=body, headers=_JSON_HEADERS)
         elif method == "PATCH":
-            response = await client.patch(url, json=data)
+            response = await client.patch(url, content=body, headers=_JSON_HEADERS)
         elif method == "DELETE":
             response = await client.delete(url)
         
@@ -33,7 +40,7 @@ async def test_endpoint(client: httpx.AsyncClient, method: str, url: str, data:
         else:
             # Show sample response data
             try:
-                json_data = response.json()
+                json_data = orjson.loads(response.content)
                 if isinstance(json_data, dict):
                     if "restaurants" in json_data:
                         print(f"   Found {len(json_data['restaurants'])} restaurants")
@@ -50,123 +57,126 @@ async def test_endpoint(client: httpx.AsyncClient, method: str, url: str, data:
         print(f"❌ {method} {url} -> Error: {e}")
         return False
 
-async def test_all_endpoints():
-    """Test all API endpoints"""
+async def test_all_endpoints(client: httpx.AsyncClient):
+    """Test all API endpoints
+
+    Independent endpoints within a section run concurrently via gather;
+    the user flow stays sequential because its calls build on each other.
+    """
     print("🧪 Testing Epicure Backend API")
     print("=" * 50)
     
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        
-        # Test basic endpoints
-        print("\n📍 Basic Endpoints")
-        await test_endpoint(client, "GET", f"{BASE_URL}/")
-        await test_endpoint(client, "GET", f"{BASE_URL}/health")
-        
-        # Test restaurant endpoints
-        print("\n🍽️ Restaurant Endpoints")
-        await test_endpoint(client, "GET", f"{BASE_URL}/api/v1/restaurants/stats")
-        await test_endpoint(client, "GET", f"{BASE_URL}/api/v1/restaurants/categories")
-        await test_endpoint(client, "GET", f"{BASE_URL}/api/v1/restaurants/debug/mock-data")
-        
-        # Test restaurant search
-        search_data = {
-            "query": "healthy lunch",
-            "location": {"lat": 40.7580, "lng": -73.9855},
-            "filters": {"max_price": 3},
-            "limit": 5
-        }
-        await test_endpoint(client, "POST", f"{BASE_URL}/api/v1/restaurants/search", search_data)
-        
-        # Test nearby restaurants
-        await test_endpoint(client, "GET", f"{BASE_URL}/api/v1/restaurants/nearby?lat=40.7580&lng=-73.9855&radius=2.0&limit=5")
-        
-        # Test user endpoints
-        print("\n👤 User Endpoints")
-        user_data = {"email": "test@example.com"}
-        await test_endpoint(client, "POST", f"{BASE_URL}/api/v1/users/create", user_data)
-        
-        test_user_id = "test-user-123"
-        await test_endpoint(client, "GET", f"{BASE_URL}/api/v1/users/{test_user_id}/profile")
-        
-        profile_data = {"age": 28, "activity_level": "moderate"}
-        await test_endpoint(client, "PUT", f"{BASE_URL}/api/v1/users/{test_user_id}/profile", profile_data)
-        
-        prefs_data = {"preferences": {"budgetFriendly": True}}
-        await test_endpoint(client, "PATCH", f"{BASE_URL}/api/v1/users/{test_user_id}/preferences", prefs_data)
-        
-        swipe_data = {"restaurant_id": "123", "action": "like"}
-        await test_endpoint(client, "POST", f"{BASE_URL}/api/v1/users/{test_user_id}/interactions/swipe", swipe_data)
-        
-        await test_endpoint(client, "GET", f"{BASE_URL}/api/v1/users/{test_user_id}/interactions/liked")
-        
-        # Test chat endpoints
-        print("\n💬 Chat Endpoints")
-        chat_data = {
-            "message": "I want healthy food for lunch under $15",
-            "context": {"location": {"lat": 40.7580, "lng": -73.9855}, "meal_time": "lunch"}
-        }
-        await test_endpoint(client, "POST", f"{BASE_URL}/api/v1/chat/message", chat_data)
-        
-        await test_endpoint(client, "GET", f"{BASE_URL}/api/v1/chat/{test_user_id}/history")
-        await test_endpoint(client, "GET", f"{BASE_URL}/api/v1/chat/debug/ai-status")
-        
-        pref_extract_data = {"message": "I'm vegan and want something spicy"}
-        await test_endpoint(client, "POST", f"{BASE_URL}/api/v1/chat/extract-preferences", pref_extract_data)
-        
-        # Test health endpoints
-        print("\n🏥 Health Endpoints")
-        health_data = {
-            "source": "apple_health",
-            "data": {
-                "basic_info": {"age": 28, "weight_kg": 70, "height_cm": 175},
-                "activity": {"activity_level": "moderate"},
-                "nutrition": {"avg_protein_g": 120}
-            }
+    # Test basic endpoints
+    print("\n📍 Basic Endpoints")
+    await asyncio.gather(
+        test_endpoint(client, "GET", f"{BASE_URL}/"),
+        test_endpoint(client, "GET", f"{BASE_URL}/health"),
+    )
+    
+    # Test restaurant endpoints
+    print("\n🍽️ Restaurant Endpoints")
+    search_data = {
+        "query": "healthy lunch",
+        "location": {"lat": 40.7580, "lng": -73.9855},
+        "filters": {"max_price": 3},
+        "limit": 5
+    }
+    await asyncio.gather(
+        test_endpoint(client, "GET", f"{BASE_URL}/api/v1/restaurants/stats"),
+        test_endpoint(client, "GET", f"{BASE_URL}/api/v1/restaurants/categories"),
+        test_endpoint(client, "GET", f"{BASE_URL}/api/v1/restaurants/debug/mock-data"),
+        test_endpoint(client, "POST", f"{BASE_URL}/api/v1/restaurants/search", search_data),
+        test_endpoint(client, "GET", f"{BASE_URL}/api/v1/restaurants/nearby?lat=40.7580&lng=-73.9855&radius=2.0&limit=5"),
+    )
+    
+    # Test user endpoints (sequential: each call builds on the previous)
+    print("\n👤 User Endpoints")
+    user_data = {"email": "test@example.com"}
+    await test_endpoint(client, "POST", f"{BASE_URL}/api/v1/users/create", user_data)
+    
+    test_user_id = "test-user-123"
+    await test_endpoint(client, "GET", f"{BASE_URL}/api/v1/users/{test_user_id}/profile")
+    
+    profile_data = {"age": 28, "activity_level": "moderate"}
+    await test_endpoint(client, "PUT", f"{BASE_URL}/api/v1/users/{test_user_id}/profile", profile_data)
+    
+    prefs_data = {"preferences": {"budgetFriendly": True}}
+    await test_endpoint(client, "PATCH", f"{BASE_URL}/api/v1/users/{test_user_id}/preferences", prefs_data)
+    
+    swipe_data = {"restaurant_id": "123", "action": "like"}
+    await test_endpoint(client, "POST", f"{BASE_URL}/api/v1/users/{test_user_id}/interactions/swipe", swipe_data)
+    
+    await test_endpoint(client, "GET", f"{BASE_URL}/api/v1/users/{test_user_id}/interactions/liked")
+    
+    # Test chat endpoints
+    print("\n💬 Chat Endpoints")
+    chat_data = {
+        "message": "I want healthy food for lunch under $15",
+        "context": {"location": {"lat": 40.7580, "lng": -73.9855}, "meal_time": "lunch"}
+    }
+    pref_extract_data = {"message": "I'm vegan and want something spicy"}
+    await asyncio.gather(
+        test_endpoint(client, "POST", f"{BASE_URL}/api/v1/chat/message", chat_data),
+        test_endpoint(client, "GET", f"{BASE_URL}/api/v1/chat/{test_user_id}/history"),
+        test_endpoint(client, "GET", f"{BASE_URL}/api/v1/chat/debug/ai-status"),
+        test_endpoint(client, "POST", f"{BASE_URL}/api/v1/chat/extract-preferences", pref_extract_data),
+    )
+    
+    # Test health endpoints
+    print("\n🏥 Health Endpoints")
+    health_data = {
+        "source": "apple_health",
+        "data": {
+            "basic_info": {"age": 28, "weight_kg": 70, "height_cm": 175},
+            "activity": {"activity_level": "moderate"},
+            "nutrition": {"avg_protein_g": 120}
         }
-        await test_endpoint(client, "POST", f"{BASE_URL}/api/v1/health/import", health_data)
-        await test_endpoint(client, "POST", f"{BASE_URL}/api/v1/health/preview", health_data)
-        await test_endpoint(client, "GET", f"{BASE_URL}/api/v1/health/{test_user_id}/connections")
-        await test_endpoint(client, "GET", f"{BASE_URL}/api/v1/health/debug/mock-health-data")
+    }
+    await asyncio.gather(
+        test_endpoint(client, "POST", f"{BASE_URL}/api/v1/health/import", health_data),
+        test_endpoint(client, "POST", f"{BASE_URL}/api/v1/health/preview", health_data),
+        test_endpoint(client, "GET", f"{BASE_URL}/api/v1/health/{test_user_id}/connections"),
+        test_endpoint(client, "GET", f"{BASE_URL}/api/v1/health/debug/mock-health-data"),
+    )
 
-async def test_frontend_compatibility():
+async def test_frontend_compatibility(client: httpx.AsyncClient):
     """Test that responses match frontend TypeScript interfaces"""
     print("\n🔗 Frontend Compatibility Tests")
     print("=" * 50)
     
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        
-        # Test restaurant search response format
-        search_data = {
-            "query": "test",
-            "location": {"lat": 40.7580, "lng": -73.9855},
-            "limit": 1
-        }
-        
-        response = await client.post(f"{BASE_URL}/api/v1/restaurants/search", json=search_data)
+    # Test restaurant search response format
+    search_data = {
+        "query": "test",
+        "location": {"lat": 40.7580, "lng": -73.9855},
+        "limit": 1
+    }
+    
+    response = await client.post(f"{BASE_URL}/api/v1/restaurants/search",
+                                 content=orjson.dumps(search_data), headers=_JSON_HEADERS)
+    
+    if response.status_code == 200:
+        data = orjson.loads(response.content)
+        restaurants = data.get("restaurants", [])
         
-        if response.status_code == 200:
-            data = response.json()
-            restaurants = data.get("restaurants", [])
+        if restaurants:
+            restaurant = restaurants[0]
+            required_fields = ["id", "name", "cuisine", "image", "distance", "price", "rating"]
+            
+            print("🔍 Checking restaurant response format:")
+            for field in required_fields:
+                if field in restaurant:
+                    print(f"   ✅ {field}: {type(restaurant[field]).__name__}")
+                else:
+                    print(f"   ❌ Missing field: {field}")
             
-            if restaurants:
-                restaurant = restaurants[0]
-                required_fields = ["id", "name", "cuisine", "image", "distance", "price", "rating"]
-                
-                print("🔍 Checking restaurant response format:")
-                for field in required_fields:
-                    if field in restaurant:
-                        print(f"   ✅ {field}: {type(restaurant[field]).__name__}")
-                    else:
-                        print(f"   ❌ Missing field: {field}")
-                
-                # Check if response matches frontend interface
-                frontend_compatible = all(field in restaurant for field in required_fields)
-                status = "✅" if frontend_compatible else "❌"
-                print(f"{status} Frontend compatibility: {'PASS' if frontend_compatible else 'FAIL'}")
-            else:
-                print("❌ No restaurants in response")
+            # Check if response matches frontend interface
+            frontend_compatible = all(field in restaurant for field in required_fields)
+            status = "✅" if frontend_compatible else "❌"
+            print(f"{status} Frontend compatibility: {'PASS' if frontend_compatible else 'FAIL'}")
         else:
-            print(f"❌ Search failed: {response.status_code}")
+            print("❌ No restaurants in response")
+    else:
+        print(f"❌ Search failed: {response.status_code}")
 
 async def main():
     """Main test runner"""
@@ -174,8 +184,14 @@ async def main():
     print("💡 Make sure the backend is running on http://localhost:8000")
     
     try:
-        await test_all_endpoints()
-        await test_frontend_compatibility()
+        # One pooled client for the whole run: keep-alive connections are
+        # reused across every request instead of re-handshaking per section
+        async with httpx.AsyncClient(
+            timeout=30.0,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        ) as client:
+            await test_all_endpoints(client)
+            await test_frontend_compatibility(client)
         
         print("\n" + "=" * 50)
         print("🎉 API testing completed!")
@@ -3,9 +3,11 @@
 Batch generate and store tags for all menu items in database
 """
 
+import asyncio
 import os
 import json
 import time
+from datetime import datetime, timezone
 from typing import List, Dict
 from dotenv import load_dotenv
 from supabase import create_client
@@ -13,6 +15,33 @@ from tag_inference_service import TagInferenceService
 
 load_dotenv()
 
+class TokenBucket:
+    """Minimal async token bucket for pacing inference calls
+    
+    Allows up to max_rate acquisitions per period and only blocks when the
+    budget is actually exhausted, unlike a fixed sleep that always pays
+    the worst-case pause.
+    """
+    
+    def __init__(self, max_rate: int, period: float = 1.0):
+        self.max_rate = max_rate
+        self.period = period
+        self._tokens = float(max_rate)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                refill = (now - self._updated) * (self.max_rate / self.period)
+                self._tokens = min(self.max_rate, self._tokens + refill)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) * self.period / self.max_rate)
+
 class BatchTagGenerator:
     def __init__(self):
         """Initialize batch tag generator"""
@@ -22,6 +51,13 @@ class BatchTagGenerator:
         )
         self.tag_service = TagInferenceService()
         
+        # Keyset cursor over menu_items.id so successive batches walk the
+        # table instead of re-reading the same first rows each iteration
+        self._last_id = None
+        
+        # Pace LLM calls to the service's rate budget
+        self.limiter = TokenBucket(20, 1.0)
+        
         print("🏷️ Batch Tag Generator initialized")
     
     def add_tag_columns_to_schema(self):
@@ -38,7 +74,10 @@ class BatchTagGenerator:
             "ALTER TABLE menu_items ADD COLUMN IF NOT EXISTS inferred_cooking_methods TEXT[];",
             "ALTER TABLE menu_items ADD COLUMN IF NOT EXISTS inferred_allergens TEXT[];",
             "ALTER TABLE menu_items ADD COLUMN IF NOT EXISTS tag_confidence NUMERIC(3,2);",
-            "ALTER TABLE menu_items ADD COLUMN IF NOT EXISTS tags_generated_at TIMESTAMPTZ;"
+            "ALTER TABLE menu_items ADD COLUMN IF NOT EXISTS tags_generated_at TIMESTAMPTZ;",
+            # Partial index so each batch's untagged-row lookup seeks instead
+            # of rescanning the table; drop it once the backfill is done
+            "CREATE INDEX IF NOT EXISTS idx_menu_items_untagged ON menu_items (id) WHERE inferred_dietary_tags IS NULL;"
         ]
         
         for statement in alter_statements:
@@ -54,33 +93,50 @@ class BatchTagGenerator:
             print(f"   {statement}")
     
     def get_menu_items_needing_tags(self, limit: int = 100) -> List[Dict]:
-        """Get menu items that need tag generation"""
+        """Get menu items that need tag generation
         
-        # Get items without tags or with empty name/description
-        items = self.supabase.table('menu_items').select(
+        Untagged rows with no name and no description are filtered out in
+        the query itself, and the keyset cursor seeks past everything a
+        previous batch already returned, so failed rows can't make the
+        loop spin on the same page.
+        """
+        
+        # Get items without tags, skipping rows where both name and
+        # description are empty server-side
+        query = self.supabase.table('menu_items').select(
             'id,restaurant_id,name,description,price'
-        ).is_('inferred_dietary_tags', 'null').limit(limit).execute()
+        ).is_('inferred_dietary_tags', 'null').or_(
+            'name.neq.,description.neq.'
+        ).order('id').limit(limit)
+        
+        if self._last_id:
+            query = query.gt('id', self._last_id)
         
-        # Filter out items with empty name and description
+        items = query.execute()
+        
+        if items.data:
+            self._last_id = items.data[-1]['id']
+        
+        # Whitespace-only text still slips past the server-side filter
         valid_items = []
-        removed_count = 0
+        empty_ids = []
         
         for item in items.data:
             name = item.get('name', '').strip()
             description = item.get('description', '').strip() if item.get('description') else ''
             
             if not name and not description:
-                # Remove items with no usable content
-                try:
-                    self.supabase.table('menu_items').delete().eq('id', item['id']).execute()
-                    removed_count += 1
-                except Exception as e:
-                    print(f"   ⚠️ Failed to remove empty item {item['id']}: {e}")
+                empty_ids.append(item['id'])
             else:
                 valid_items.append(item)
         
-        if removed_count > 0:
-            print(f"🗑️ Removed {removed_count} items with empty name and description")
+        # Remove items with no usable content in one round-trip
+        if empty_ids:
+            try:
+                self.supabase.table('menu_items').delete().in_('id', empty_ids).execute()
+                print(f"🗑️ Removed {len(empty_ids)} items with empty name and description")
+            except Exception as e:
+                print(f"   ⚠️ Failed to remove {len(empty_ids)} empty items: {e}")
         
         return valid_items
     
@@ -127,7 +183,8 @@ class BatchTagGenerator:
                 'inferred_cooking_methods': item_tags.cooking_methods,
                 'inferred_allergens': item_tags.allergens,
                 'tag_confidence': item_tags.confidence,
-                'tags_generated_at': 'NOW()'
+                # PostgREST doesn't interpret 'NOW()'; send a real timestamp
+                'tags_generated_at': datetime.now(timezone.utc).isoformat()
             }
             
             return tag_data
@@ -136,8 +193,14 @@ class BatchTagGenerator:
             print(f"   ❌ Error generating tags for {name}: {e}")
             return None
     
-    def batch_generate_tags(self, batch_size: int = 50, max_items: int = 1000):
-        """Generate tags for all menu items in batches"""
+    async def batch_generate_tags(self, batch_size: int = 50, max_items: int = 1000,
+                                  concurrency: int = 8):
+        """Generate tags for all menu items in batches
+
+        Inference calls are latency-bound LLM requests, so each batch fans
+        out through a thread pool with a semaphore bounding in-flight
+        requests instead of inferring one item at a time.
+        """
         
         print(f"🚀 Starting batch tag generation (batch_size={batch_size}, max_items={max_items})")
         
@@ -147,6 +210,13 @@ class BatchTagGenerator:
         # Cache restaurant contexts to avoid repeated queries
         restaurant_cache = {}
         
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def infer_one(item: Dict, context: Dict):
+            async with semaphore:
+                await self.limiter.acquire()
+                return await asyncio.to_thread(self.generate_tags_for_item, item, context)
+        
         while total_processed < max_items:
             # Get next batch of items
             items = self.get_menu_items_needing_tags(batch_size)
@@ -155,46 +225,62 @@ class BatchTagGenerator:
                 print("✅ No more items need tag generation")
                 break
             
+            items = items[:max_items - total_processed]
             print(f"\n📦 Processing batch of {len(items)} items...")
             
-            batch_updates = []
+            # Prefetch restaurant contexts the cache is missing with one
+            # IN query instead of a round-trip per restaurant
+            missing = {item['restaurant_id'] for item in items} - restaurant_cache.keys()
+            if missing:
+                rows = self.supabase.table('restaurants').select(
+                    'id,name,cuisine'
+                ).in_('id', list(missing)).execute().data or []
+                for row in rows:
+                    restaurant_cache[row['id']] = {
+                        'restaurant_name': row.get('name') or '',
+                        'restaurant_cuisine': row.get('cuisine') or ''
+                    }
+                # Restaurants that vanished mid-run still get a context
+                for restaurant_id in missing - restaurant_cache.keys():
+                    restaurant_cache[restaurant_id] = {'restaurant_name': '', 'restaurant_cuisine': ''}
             
-            for i, item in enumerate(items):
-                if total_processed >= max_items:
-                    break
-                
-                # Get restaurant context (with caching)
-                restaurant_id = item['restaurant_id']
-                if restaurant_id not in restaurant_cache:
-                    restaurant_cache[restaurant_id] = self.get_restaurant_context(restaurant_id)
-                
-                restaurant_context = restaurant_cache[restaurant_id]
-                
-                # Generate tags
-                print(f"   🏷️ {i+1}/{len(items)}: {item.get('name', 'Unnamed item')}")
-                tag_data = self.generate_tags_for_item(item, restaurant_context)
-                
-                if tag_data:
-                    # Update item in database
-                    try:
-                        self.supabase.table('menu_items').update(tag_data).eq('id', item['id']).execute()
-                        total_successful += 1
-                        print(f"      ✅ Tags: {tag_data['inferred_dietary_tags']}, {tag_data['inferred_cuisine_type']}")
-                    except Exception as e:
-                        print(f"      ❌ Failed to update: {e}")
-                
+            # Infer the whole batch concurrently
+            results = await asyncio.gather(
+                *(infer_one(item, restaurant_cache[item['restaurant_id']]) for item in items),
+                return_exceptions=True
+            )
+            
+            batch_updates = []
+            for item, tag_data in zip(items, results):
                 total_processed += 1
-                
-                # Rate limiting to avoid hitting API limits
-                if i % 10 == 0:
-                    time.sleep(1)  # Brief pause every 10 items
+                if isinstance(tag_data, BaseException):
+                    print(f"   ❌ Inference failed for {item.get('name', 'Unnamed item')}: {tag_data}")
+                    continue
+                if tag_data:
+                    # Queue the row; the whole batch flushes as one upsert.
+                    # Carry the keys required on insert so the upsert row is
+                    # valid even though the conflict path only updates tags.
+                    tag_data['id'] = item['id']
+                    tag_data['restaurant_id'] = item['restaurant_id']
+                    tag_data['name'] = item.get('name', '')
+                    batch_updates.append(tag_data)
+                    print(f"   ✅ {item.get('name', 'Unnamed item')}: {tag_data['inferred_dietary_tags']}, {tag_data['inferred_cuisine_type']}")
             
-            print(f"📊 Batch complete. Processed: {total_processed}, Successful: {total_successful}")
+            # One round-trip per batch instead of one per item
+            if batch_updates:
+                try:
+                    self.supabase.table('menu_items').upsert(batch_updates, on_conflict='id').execute()
+                    total_successful += len(batch_updates)
+                except Exception as e:
+                    print(f"   ⚠️ Batch upsert failed ({e}), retrying rows individually")
+                    for row in batch_updates:
+                        try:
+                            self.supabase.table('menu_items').upsert(row, on_conflict='id').execute()
+                            total_successful += 1
+                        except Exception as row_error:
+                            print(f"      ❌ Failed to update {row['id']}: {row_error}")
             
-            # Longer pause between batches
-            if total_processed < max_items and items:
-                print("⏸️ Pausing between batches...")
-                time.sleep(5)
+            print(f"📊 Batch complete. Processed: {total_processed}, Successful: {total_successful}")
         
         print(f"\n🎉 Tag generation complete!")
         print(f"📊 Final stats:")
@@ -203,16 +289,26 @@ class BatchTagGenerator:
         print(f"   Success rate: {(total_successful/total_processed*100):.1f}%")
     
     def verify_tag_coverage(self):
-        """Check how many items have tags"""
+        """Check how many items have tags
+        
+        Prefers the tag_coverage function (see tag_coverage_function.sql),
+        which produces both counts from one scan; falls back to the two
+        count queries if it isn't installed.
+        """
         
-        total_items = self.supabase.table('menu_items').select('id', count='exact').execute()
-        tagged_items = self.supabase.table('menu_items').select('id', count='exact').not_.is_('inferred_dietary_tags', 'null').execute()
+        try:
+            counts = self.supabase.rpc('tag_coverage').execute().data[0]
+            total_count = counts['total']
+            tagged_count = counts['tagged']
+        except Exception:
+            total_count = self.supabase.table('menu_items').select('id', count='exact').execute().count
+            tagged_count = self.supabase.table('menu_items').select('id', count='exact').not_.is_('inferred_dietary_tags', 'null').execute().count
         
-        coverage = (tagged_items.count / total_items.count * 100) if total_items.count > 0 else 0
+        coverage = (tagged_count / total_count * 100) if total_count > 0 else 0
         
         print(f"📊 Tag Coverage Report:")
-        print(f"   Total menu items: {total_items.count:,}")
-        print(f"   Items with tags: {tagged_items.count:,}")
+        print(f"   Total menu items: {total_count:,}")
+        print(f"   Items with tags: {tagged_count:,}")
         print(f"   Coverage: {coverage:.1f}%")
         
         return coverage
@@ -237,7 +333,7 @@ def main():
     
     if response.lower() == 'y':
         print("\n🚀 Starting tag generation...")
-        generator.batch_generate_tags(batch_size=20, max_items=200)  # Start with smaller batch for testing
+        asyncio.run(generator.batch_generate_tags(batch_size=20, max_items=200))  # Start with smaller batch for testing
         
         print("\n📊 Final coverage check:")
         generator.verify_tag_coverage()
@@ -0,0 +1,87 @@
+-- Server-side menu item search: flat LEFT JOIN + DISTINCT ON dedup in one
+-- function call, avoiding the per-row LATERAL composition PostgREST emits
+-- for nested restaurants(...) embeds.
+-- Run this in your Supabase SQL editor (like add_helper_functions.sql).
+
+-- Indexes for the hot filters
+CREATE INDEX IF NOT EXISTS idx_menu_items_calories_present
+    ON menu_items (estimated_calories)
+    WHERE estimated_calories IS NOT NULL AND estimated_calories > 0;
+
+CREATE INDEX IF NOT EXISTS idx_menu_items_dietary_tags_gin
+    ON menu_items USING gin (inferred_dietary_tags);
+
+CREATE INDEX IF NOT EXISTS idx_menu_items_allergens_gin
+    ON menu_items USING gin (inferred_allergens);
+
+-- Join path: restaurant lookup narrowed by the calories-present predicate
+CREATE INDEX IF NOT EXISTS idx_menu_items_restaurant_calories
+    ON menu_items (restaurant_id, estimated_calories)
+    WHERE estimated_calories IS NOT NULL AND estimated_calories > 0;
+
+-- Default sort order of the search function
+CREATE INDEX IF NOT EXISTS idx_menu_items_confidence_desc
+    ON menu_items (nutrition_confidence DESC NULLS LAST);
+
+-- Search with filtering, dedup and sort pushed down to Postgres.
+-- Each row comes back as the menu_items jsonb with the joined restaurant
+-- under a 'restaurants' key, matching the embed shape the API already
+-- consumes.
+CREATE OR REPLACE FUNCTION search_menu_items_flat(
+    p_query text DEFAULT NULL,
+    p_max_calories numeric DEFAULT NULL,
+    p_min_protein numeric DEFAULT NULL,
+    p_max_price numeric DEFAULT NULL,
+    p_dietary text[] DEFAULT NULL,
+    p_categories text[] DEFAULT NULL,
+    p_allergen_free text[] DEFAULT NULL,
+    p_sort text DEFAULT 'relevance',
+    p_desc boolean DEFAULT true,
+    p_limit int DEFAULT 20,
+    p_offset int DEFAULT 0
+) RETURNS SETOF jsonb
+LANGUAGE sql STABLE AS $$
+    SELECT to_jsonb(mi.*) || jsonb_build_object('restaurants', COALESCE(to_jsonb(r.*), '{}'::jsonb))
+    FROM (
+        SELECT DISTINCT ON (m.name, m.restaurant_id) m.*
+        FROM menu_items m
+        WHERE m.estimated_calories IS NOT NULL AND m.estimated_calories > 0
+          AND (p_query IS NULL
+               OR m.name ILIKE '%' || p_query || '%'
+               OR m.description ILIKE '%' || p_query || '%')
+          AND (p_max_calories IS NULL OR m.estimated_calories <= p_max_calories)
+          AND (p_min_protein IS NULL OR m.estimated_protein_g >= p_min_protein)
+          AND (p_max_price IS NULL OR m.price <= p_max_price)
+          AND (p_dietary IS NULL OR m.inferred_dietary_tags && p_dietary)
+          AND (p_categories IS NULL OR m.inferred_meal_category = ANY(p_categories))
+          AND (p_allergen_free IS NULL OR NOT (m.inferred_allergens && p_allergen_free))
+        ORDER BY m.name, m.restaurant_id
+    ) mi
+    LEFT JOIN restaurants r ON r.id = mi.restaurant_id
+    ORDER BY
+        CASE WHEN p_sort = 'price'    AND NOT p_desc THEN mi.price END ASC,
+        CASE WHEN p_sort = 'price'    AND p_desc     THEN mi.price END DESC,
+        CASE WHEN p_sort = 'calories' AND NOT p_desc THEN mi.estimated_calories END ASC,
+        CASE WHEN p_sort = 'calories' AND p_desc     THEN mi.estimated_calories END DESC,
+        CASE WHEN p_sort = 'protein'  AND NOT p_desc THEN mi.estimated_protein_g END ASC,
+        CASE WHEN p_sort = 'protein'  AND p_desc     THEN mi.estimated_protein_g END DESC,
+        CASE WHEN p_sort = 'rating'   AND NOT p_desc THEN r.rating END ASC,
+        CASE WHEN p_sort = 'rating'   AND p_desc     THEN r.rating END DESC,
+        mi.nutrition_confidence DESC NULLS LAST,
+        mi.estimated_calories DESC NULLS LAST
+    LIMIT p_limit OFFSET p_offset
+$$;
+
+-- Single item + its restaurant as one jsonb payload: one row, one plain
+-- join, no LATERAL composition and no second round trip.
+CREATE OR REPLACE FUNCTION get_menu_item_with_restaurant(p_id uuid)
+RETURNS jsonb
+LANGUAGE sql STABLE AS $$
+    SELECT jsonb_build_object(
+        'item', to_jsonb(mi.*),
+        'restaurant', COALESCE(to_jsonb(r.*), '{}'::jsonb)
+    )
+    FROM menu_items mi
+    LEFT JOIN restaurants r ON r.id = mi.restaurant_id
+    WHERE mi.id = p_id
+$$;
@@ -0,0 +1,34 @@
+-- Nearby restaurant search with the distance computed by PostGIS instead of
+-- re-deriving it with Python haversine after the rows come back.
+-- Run this in your Supabase SQL editor (like add_helper_functions.sql).
+
+-- Each row is the restaurants jsonb plus a 'distance_miles' key, computed
+-- with ST_Distance over the same geography the ST_DWithin filter already
+-- evaluated.
+CREATE OR REPLACE FUNCTION search_restaurants_nearby(
+    p_lat double precision,
+    p_lng double precision,
+    p_radius_meters double precision DEFAULT 3218.7,
+    p_max_price int DEFAULT NULL,
+    p_cuisines text[] DEFAULT NULL,
+    p_limit int DEFAULT 20
+) RETURNS SETOF jsonb
+LANGUAGE sql STABLE AS $$
+    SELECT to_jsonb(r.*) || jsonb_build_object(
+        'distance_miles',
+        ST_Distance(
+            r.location::geography,
+            ST_SetSRID(ST_MakePoint(p_lng, p_lat), 4326)::geography
+        ) / 1609.34
+    )
+    FROM restaurants r
+    WHERE ST_DWithin(
+            r.location::geography,
+            ST_SetSRID(ST_MakePoint(p_lng, p_lat), 4326)::geography,
+            p_radius_meters
+          )
+      AND (p_max_price IS NULL OR r.price_level <= p_max_price)
+      AND (p_cuisines IS NULL OR r.cuisine = ANY(p_cuisines))
+    ORDER BY r.location <-> ST_SetSRID(ST_MakePoint(p_lng, p_lat), 4326)
+    LIMIT p_limit
+$$;
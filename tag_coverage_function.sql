@@ -0,0 +1,10 @@
+-- Tag coverage in one pass: count(*) and count(inferred_dietary_tags)
+-- come from the same scan instead of two separate count queries.
+-- Run this in your Supabase SQL editor (like add_helper_functions.sql).
+
+CREATE OR REPLACE FUNCTION tag_coverage()
+RETURNS TABLE(total bigint, tagged bigint)
+LANGUAGE sql STABLE AS $$
+    SELECT count(*), count(inferred_dietary_tags)
+    FROM menu_items
+$$;